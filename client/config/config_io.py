@@ -13,16 +13,42 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "region": None,  # becomes {"x": int, "y": int, "w": int, "h": int}
         "monitor_index": 0,
         "dpi_scale": 1.0,
+        "pool_size": 4,  # recycled frame buffers shared by capture and the preview
+        "backend": "mss",  # "mss", "xshm", "xlib", "file", "synthetic", or "auto" (probe, fastest wins)
+        "file_path": None,  # .npy recording for the "file" backend
+        "trigger": "poll",  # "poll" (every tick) or "damage" (X11 XDamage: only when the region changed)
+        "idle_capture_ms": 500,  # with "damage": capture anyway after this long without damage
     },
     "vision": {
-        "white_threshold": 210,
-        "black_threshold": 50,
-        "min_blob_size": 200,
+        "white_threshold": 650,  # brightness = B + G + R (0..765)
+        "black_threshold": 100,
+        # 0 = thresholds from before tuning, which the detector never read: they are
+        # left in the file but ignored (see migrate_config); 1 = thresholds are used
+        "thresholds_version": 1,
+        "crop_left": 0.40,       # horizontal band scanned, as fractions of the width
+        "crop_right": 0.60,
+        "min_signal": 2,         # min white/black pixels in a row to count as found
+        "pyramid_factor": 4,        # coarse-to-fine detection; 1 = always full resolution
+        "pyramid_min_height": 800,  # only worth it for tall regions (see debug/bench_vision.py)
+        "pyramid_tolerance_px": 0,  # >= factor skips the full-resolution refinement
+        "kernel": "auto",  # row-count kernel: "auto" (fastest verified), "numpy", "numba", "opencv"
+        "adaptive_fidelity": False,  # degrade detection when it runs over budget; not with the pyramid (core/fidelity.py)
+        "tick_budget_ms": 0,         # detection time per tick; 0 = half the loop_hz tick interval
     },
     "control": {
         "tolerance_px": 12,
         "min_flip_ms": 60,
         "loop_hz": 90,
+        "pwm_enabled": False,  # micro-holds on a dedicated timing thread
+        "pwm_period_ms": 20,
+        "latency_ms": None,      # measured input-to-photon loop latency (p50)
+        "latency_p90_ms": None,
+        "adaptive_tick": False,  # schedule captures from distance / closing speed
+        "min_hz": 30,
+        "max_hz": 240,
+        "idle_hz": 90,            # adaptive_tick poll rate while nothing is detected
+        "max_frame_age_ms": 100,  # a result reused without a new frame is ignored after this (input released)
+        "watchdog_ms": 250,       # release input if no new frame for this long; 0 = off
     },
     "input": {
         "mouse_button": "left",  # "left" or "right"
@@ -33,14 +59,41 @@ DEFAULT_CONFIG: Dict[str, Any] = {
         "require_game_focused": False,
         "max_run_seconds": 0,  # 0 = no limit
     },
+    "realtime": {
+        "priority": "inherit",  # runner QThread priority: inherit/normal/high/highest/time_critical
+        "capture_cores": [],    # pin the capture loop thread (Linux only); [] = no pinning
+        "control_cores": [],    # pin the PWM actuator thread
+        "gc_mode": "default",   # "default", "freeze", or "disable" (collect between rounds)
+    },
+    "supervisor": {
+        # one headless worker process per entry (python -m client.core.supervisor):
+        # {"name": "a", "region": {x, y, w, h}, "cores": [2], "dry_run": false, "overrides": {...}}
+        # [] = a single worker on capture.region
+        "instances": [],
+        "restart_limit": 5,       # restarts per worker before giving up on it
+        "stats_interval_s": 2.0,  # how often workers report their counters
+    },
+    "ui": {
+        "performance_mode": True,  # while running or minimized: no animation, throttled preview
+        "preview_hz": 5,           # preview rate in performance mode; 0 = preview off
+        "status_hz": 4,            # status / CPU label refresh rate
+    },
     "debug": {
         "show_preview": True,
         "draw_overlay": True,
         "log_level": "info",  # "info" or "debug"
+        "history_seconds": 300,  # detection history kept for the plot
     },
 }
 
 
+CAPTURE_BACKENDS = ("auto", "mss", "xshm", "xlib", "file", "synthetic")
+CAPTURE_TRIGGERS = ("poll", "damage")
+DETECT_KERNELS = ("auto", "numpy", "numba", "opencv")
+THREAD_PRIORITIES = ("inherit", "normal", "high", "highest", "time_critical")
+GC_MODES = ("default", "freeze", "disable")
+
+
 def get_config_path() -> str:
     """
     Returns an absolute path to config.json, relative to this file location.
@@ -87,6 +140,60 @@ def validate_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
     if region is not None and not _is_valid_region(region):
         cfg["capture"]["region"] = None
 
+    capture = cfg.setdefault("capture", {})
+    pool_size = capture.get("pool_size", DEFAULT_CONFIG["capture"]["pool_size"])
+    if not isinstance(pool_size, int) or not (2 <= pool_size <= 32):
+        capture["pool_size"] = DEFAULT_CONFIG["capture"]["pool_size"]
+
+    if capture.get("backend") not in CAPTURE_BACKENDS:
+        capture["backend"] = DEFAULT_CONFIG["capture"]["backend"]
+
+    if capture.get("trigger") not in CAPTURE_TRIGGERS:
+        capture["trigger"] = DEFAULT_CONFIG["capture"]["trigger"]
+    idle_ms = capture.get("idle_capture_ms", DEFAULT_CONFIG["capture"]["idle_capture_ms"])
+    if not isinstance(idle_ms, int) or isinstance(idle_ms, bool) or not (10 <= idle_ms <= 10000):
+        capture["idle_capture_ms"] = DEFAULT_CONFIG["capture"]["idle_capture_ms"]
+
+    # vision sanity
+    vision = cfg.setdefault("vision", {})
+    for key, lo, hi in (
+        ("white_threshold", 0, 765),
+        ("black_threshold", 0, 765),
+        ("min_signal", 1, 1000),
+        ("pyramid_factor", 1, 16),
+        ("pyramid_min_height", 0, 10000),
+        ("pyramid_tolerance_px", 0, 64),
+        ("thresholds_version", 0, 1),
+    ):
+        val = vision.get(key, DEFAULT_CONFIG["vision"][key])
+        if not isinstance(val, int) or isinstance(val, bool) or not (lo <= val <= hi):
+            vision[key] = DEFAULT_CONFIG["vision"][key]
+
+    defaults = DEFAULT_CONFIG["vision"]
+    if vision.get("black_threshold", defaults["black_threshold"]) >= vision.get("white_threshold", defaults["white_threshold"]):
+        vision["white_threshold"] = defaults["white_threshold"]
+        vision["black_threshold"] = defaults["black_threshold"]
+
+    crop_left = vision.get("crop_left", defaults["crop_left"])
+    crop_right = vision.get("crop_right", defaults["crop_right"])
+    if (
+        not isinstance(crop_left, (int, float)) or not isinstance(crop_right, (int, float))
+        or not (0.0 <= crop_left < crop_right <= 1.0)
+    ):
+        crop_left = defaults["crop_left"]
+        crop_right = defaults["crop_right"]
+    vision["crop_left"] = float(crop_left)
+    vision["crop_right"] = float(crop_right)
+
+    if vision.get("kernel") not in DETECT_KERNELS:
+        vision["kernel"] = DEFAULT_CONFIG["vision"]["kernel"]
+
+    if not isinstance(vision.get("adaptive_fidelity", False), bool):
+        vision["adaptive_fidelity"] = DEFAULT_CONFIG["vision"]["adaptive_fidelity"]
+    budget = vision.get("tick_budget_ms", DEFAULT_CONFIG["vision"]["tick_budget_ms"])
+    if not isinstance(budget, (int, float)) or isinstance(budget, bool) or not (0 <= budget <= 1000):
+        vision["tick_budget_ms"] = DEFAULT_CONFIG["vision"]["tick_budget_ms"]
+
     # control sanity
     control = cfg.setdefault("control", {})
     tol = control.get("tolerance_px", DEFAULT_CONFIG["control"]["tolerance_px"])
@@ -101,26 +208,99 @@ def validate_config(cfg: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(loop_hz, int) or not (20 <= loop_hz <= 240):
         control["loop_hz"] = DEFAULT_CONFIG["control"]["loop_hz"]
 
+    min_hz = control.get("min_hz", DEFAULT_CONFIG["control"]["min_hz"])
+    if not isinstance(min_hz, int) or not (5 <= min_hz <= 240):
+        control["min_hz"] = min_hz = DEFAULT_CONFIG["control"]["min_hz"]
+
+    max_hz = control.get("max_hz", DEFAULT_CONFIG["control"]["max_hz"])
+    if not isinstance(max_hz, int) or not (min_hz <= max_hz <= 1000):
+        control["max_hz"] = max_hz = max(min_hz, DEFAULT_CONFIG["control"]["max_hz"])
+
+    idle_hz = control.get("idle_hz", DEFAULT_CONFIG["control"]["idle_hz"])
+    if not isinstance(idle_hz, int) or not (min_hz <= idle_hz <= max_hz):
+        control["idle_hz"] = min(max_hz, max(min_hz, DEFAULT_CONFIG["control"]["idle_hz"]))
+
+    if not isinstance(control.get("adaptive_tick"), bool):
+        control["adaptive_tick"] = DEFAULT_CONFIG["control"]["adaptive_tick"]
+
+    pwm_period = control.get("pwm_period_ms", DEFAULT_CONFIG["control"]["pwm_period_ms"])
+    if not isinstance(pwm_period, int) or not (5 <= pwm_period <= 100):
+        control["pwm_period_ms"] = DEFAULT_CONFIG["control"]["pwm_period_ms"]
+
+    if not isinstance(control.get("pwm_enabled"), bool):
+        control["pwm_enabled"] = DEFAULT_CONFIG["control"]["pwm_enabled"]
+
+    for key, hi in (("max_frame_age_ms", 5000), ("watchdog_ms", 10000)):
+        val = control.get(key, DEFAULT_CONFIG["control"][key])
+        if not isinstance(val, int) or isinstance(val, bool) or not (0 <= val <= hi):
+            control[key] = DEFAULT_CONFIG["control"][key]
+
+    for key in ("latency_ms", "latency_p90_ms"):
+        val = control.get(key)
+        if val is not None and (not isinstance(val, (int, float)) or isinstance(val, bool) or val < 0):
+            control[key] = None
+
     # input sanity
     inp = cfg.setdefault("input", {})
     btn = inp.get("mouse_button", "left")
     if btn not in ("left", "right"):
         inp["mouse_button"] = "left"
 
+    # realtime sanity
+    rt = cfg.setdefault("realtime", {})
+    if rt.get("priority") not in THREAD_PRIORITIES:
+        rt["priority"] = DEFAULT_CONFIG["realtime"]["priority"]
+    for key in ("capture_cores", "control_cores"):
+        cores = rt.get(key)
+        if not isinstance(cores, list) or not all(isinstance(c, int) and c >= 0 for c in cores):
+            rt[key] = []
+    if rt.get("gc_mode") not in GC_MODES:
+        rt["gc_mode"] = DEFAULT_CONFIG["realtime"]["gc_mode"]
+
+    # supervisor sanity
+    sup = cfg.setdefault("supervisor", {})
+    instances = sup.get("instances")
+    if not isinstance(instances, list):
+        instances = []
+    sup["instances"] = [
+        inst for inst in instances
+        if isinstance(inst, dict) and _is_valid_region(inst.get("region"))
+        and isinstance(inst.get("cores", []), list)
+        and all(isinstance(c, int) and c >= 0 for c in inst.get("cores", []))
+    ]
+    limit = sup.get("restart_limit", DEFAULT_CONFIG["supervisor"]["restart_limit"])
+    if not isinstance(limit, int) or isinstance(limit, bool) or limit < 0:
+        sup["restart_limit"] = DEFAULT_CONFIG["supervisor"]["restart_limit"]
+    interval = sup.get("stats_interval_s", DEFAULT_CONFIG["supervisor"]["stats_interval_s"])
+    if not isinstance(interval, (int, float)) or isinstance(interval, bool) or not (0.1 <= interval <= 60):
+        sup["stats_interval_s"] = DEFAULT_CONFIG["supervisor"]["stats_interval_s"]
+
+    # ui sanity
+    ui = cfg.setdefault("ui", {})
+    if not isinstance(ui.get("performance_mode", True), bool):
+        ui["performance_mode"] = DEFAULT_CONFIG["ui"]["performance_mode"]
+    for key, lo, hi in (("preview_hz", 0, 60), ("status_hz", 1, 30)):
+        val = ui.get(key, DEFAULT_CONFIG["ui"][key])
+        if not isinstance(val, int) or isinstance(val, bool) or not (lo <= val <= hi):
+            ui[key] = DEFAULT_CONFIG["ui"][key]
+
     # debug sanity
     dbg = cfg.setdefault("debug", {})
     lvl = dbg.get("log_level", "info")
     if lvl not in ("info", "debug"):
         dbg["log_level"] = "info"
+    seconds = dbg.get("history_seconds", DEFAULT_CONFIG["debug"]["history_seconds"])
+    if not isinstance(seconds, int) or isinstance(seconds, bool) or not (1 <= seconds <= 3600):
+        dbg["history_seconds"] = DEFAULT_CONFIG["debug"]["history_seconds"]
 
     return cfg
 
 
-def save_config(cfg: Dict[str, Any]) -> None:
+def save_config(cfg: Dict[str, Any], path: Optional[str] = None) -> None:
     """
     Safe write: write to temp then replace.
     """
-    path = get_config_path()
+    path = path or get_config_path()
     tmp_path = path + ".tmp"
 
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -132,17 +312,31 @@ def save_config(cfg: Dict[str, Any]) -> None:
     os.replace(tmp_path, path)
 
 
-def load_config() -> Dict[str, Any]:
+def migrate_config(user_cfg: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Loads config.json. If missing, creates it from defaults.
+    Marks settings from older config files before defaults are merged in.
+    - vision without thresholds_version: a block that still has min_blob_size
+      predates tuning and its thresholds were never read, so it gets
+      thresholds_version 0 (values kept, detector ignores them); otherwise 1
+    """
+    user_cfg = deepcopy(user_cfg)
+    vision = user_cfg.get("vision")
+    if isinstance(vision, dict) and "thresholds_version" not in vision:
+        vision["thresholds_version"] = 0 if "min_blob_size" in vision else 1
+    return user_cfg
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Loads config.json (or `path`). If missing, creates it from defaults.
     If corrupted, backs it up and recreates defaults.
     Always returns a validated config with missing keys filled in.
     """
-    path = get_config_path()
+    path = path or get_config_path()
 
     if not os.path.exists(path):
         cfg = deepcopy(DEFAULT_CONFIG)
-        save_config(cfg)
+        save_config(cfg, path)
         return cfg
 
     try:
@@ -162,15 +356,15 @@ def load_config() -> Dict[str, Any]:
             pass
 
         cfg = deepcopy(DEFAULT_CONFIG)
-        save_config(cfg)
+        save_config(cfg, path)
         return cfg
 
-    merged = deep_merge(user_cfg, DEFAULT_CONFIG)
+    merged = deep_merge(migrate_config(user_cfg), DEFAULT_CONFIG)
     merged = validate_config(merged)
 
     # If we filled in missing keys or fixed bad values, persist it.
     if merged != user_cfg:
-        save_config(merged)
+        save_config(merged, path)
 
     return merged
 
@@ -185,6 +379,17 @@ def set_capture_region(x: int, y: int, w: int, h: int) -> Dict[str, Any]:
     save_config(cfg)
     return cfg
 
+def set_measured_latency(p50_ms: Optional[float], p90_ms: Optional[float]) -> Dict[str, Any]:
+    """
+    Stores the latency calibration result for the control/scheduling code.
+    """
+    cfg = load_config()
+    cfg["control"]["latency_ms"] = None if p50_ms is None else round(float(p50_ms), 2)
+    cfg["control"]["latency_p90_ms"] = None if p90_ms is None else round(float(p90_ms), 2)
+    cfg = validate_config(cfg)
+    save_config(cfg)
+    return cfg
+
 if __name__ == "__main__":
     print("=== CONFIG IO TEST ===")
     cfg = load_config()
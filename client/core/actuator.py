@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class TimingStats:
+    """
+    Running error stats for emitted edges (seconds, actual - scheduled).
+    """
+    edges: int = 0
+    total_abs_error: float = 0.0
+    max_abs_error: float = 0.0
+    overruns: int = 0
+
+    def add(self, error: float) -> None:
+        err = abs(error)
+        self.edges += 1
+        self.total_abs_error += err
+        if err > self.max_abs_error:
+            self.max_abs_error = err
+
+    def summary(self) -> Dict[str, float]:
+        mean = self.total_abs_error / self.edges if self.edges else 0.0
+        return {
+            "edges": self.edges,
+            "mean_error_ms": mean * 1000.0,
+            "max_error_ms": self.max_abs_error * 1000.0,
+            "overruns": self.overruns,
+        }
+
+
+class PwmActuator:
+    """
+    Duty-cycle mouse actuator running on its own timing thread.
+    - The controller only sets a target hold fraction (0..1)
+    - Each period starts with a press and releases after duty * period
+    - Edges are placed with a coarse sleep followed by a short spin,
+      so precision is ~1 ms without blocking the capture loop
+    """
+
+    def __init__(
+        self,
+        press: Callable[[], None],
+        release: Callable[[], None],
+        period: float = 0.020,
+        min_pulse: float = 0.001,
+        spin: float = 0.0015,
+    ) -> None:
+        self._press = press
+        self._release = release
+        self.period = period
+        self.min_pulse = min_pulse   # pulses shorter than this are dropped (or merged)
+        self.spin = spin             # how long before an edge we stop sleeping and spin
+
+        self.cores: Optional[List[int]] = None   # CPU affinity for the timing thread
+        self.pressed = False
+        self.stats = TimingStats()
+
+        self._duty = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def duty(self) -> float:
+        return self._duty
+
+    def set_duty(self, duty: float) -> None:
+        # a single float store, safe to call from any thread
+        self._duty = max(0.0, min(1.0, float(duty)))
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="PwmActuator", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._duty = 0.0
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+        if self.pressed:
+            self._release()
+            self.pressed = False
+
+    def _sleep_until(self, deadline: float) -> float:
+        # coarse sleep (wakes early on stop), then spin for the last stretch
+        remaining = deadline - time.perf_counter()
+        if remaining > self.spin:
+            self._stop.wait(remaining - self.spin)
+        now = time.perf_counter()
+        while now < deadline and not self._stop.is_set():
+            now = time.perf_counter()
+        return now
+
+    def _edge(self, down: bool, scheduled: float) -> None:
+        now = self._sleep_until(scheduled)
+        if self._stop.is_set() or down == self.pressed:
+            return
+        if down:
+            self._press()
+        else:
+            self._release()
+        self.pressed = down
+        self.stats.add(now - scheduled)
+
+    def _run(self) -> None:
+        if self.cores:
+            from .realtime import pin_current_thread
+
+            pin_current_thread(self.cores, "control")
+        period_start = time.perf_counter()
+        while not self._stop.is_set():
+            on_time = self._duty * self.period
+            if on_time < self.min_pulse:
+                on_time = 0.0
+            elif self.period - on_time < self.min_pulse:
+                on_time = self.period
+
+            if on_time > 0.0:
+                self._edge(True, period_start)
+            if on_time < self.period:
+                self._edge(False, period_start + on_time)
+
+            period_start += self.period
+            now = time.perf_counter()
+            if now - period_start > self.period:
+                # fell a whole period behind (GIL, OS hiccup); resync instead of bursting
+                self.stats.overruns += 1
+                period_start = now
+            self._sleep_until(period_start)
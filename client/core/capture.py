@@ -1,19 +1,242 @@
 from __future__ import annotations
-from typing import Dict, Tuple
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
 import mss
+import numpy as np
 
-def grab_region(region: Dict[str, int]) -> Tuple[bytes, int, int]:
-    monitor = {
+from .capture_base import CaptureBackend, CaptureTrigger, PollTrigger
+from .capture_x11 import DamageTrigger, XlibBackend, XShmBackend
+from .frame_pool import FrameBuffer
+from .log_ring import LOG
+
+# mss handles are per thread (X11 display / Windows DC), so keep one per thread
+# instead of opening a new one every frame.
+_local = threading.local()
+
+
+def _sct() -> "mss.base.MSSBase":
+    sct = getattr(_local, "sct", None)
+    if sct is None:
+        sct = mss.mss()
+        _local.sct = sct
+    return sct
+
+
+def _monitor(region: Dict[str, int]) -> Dict[str, int]:
+    return {
         "left": region["x"],
         "top": region["y"],
         "width": region["w"],
         "height": region["h"],
     }
 
+
+def grab_region(region: Dict[str, int]) -> Tuple[bytes, int, int]:
+    monitor = _monitor(region)
+
+    try:
+        shot = _sct().grab(monitor)
+        return shot.raw, shot.width, shot.height
+        print: ("capture succeed")
+    except Exception as e:
+        raise RuntimeError(f"Capture failed: {e}")
+
+
+def grab_region_into(region: Dict[str, int], buf: FrameBuffer) -> FrameBuffer:
+    """
+    Captures into a pooled buffer instead of handing out a new bytes object.
+    """
     try:
-        with mss.mss() as sct:
-            shot = sct.grab(monitor)
-            return shot.raw, shot.width, shot.height
-            print: ("capture succeed")
+        shot = _sct().grab(_monitor(region))
+        # memoryview assignment refuses size mismatches instead of resizing the buffer
+        memoryview(buf.raw)[:] = shot.raw
     except Exception as e:
         raise RuntimeError(f"Capture failed: {e}")
+    return buf
+
+
+class MssBackend(CaptureBackend):
+    name = "mss"
+
+    def grab_into(self, buf: FrameBuffer) -> FrameBuffer:
+        return grab_region_into(self.region, buf)
+
+
+class FileBackend(CaptureBackend):
+    """
+    Replays recorded frames from an (N, h, w, 4) uint8 .npy file (capture.file_path), looping.
+    """
+
+    name = "file"
+    screen = False
+
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(region, cfg)
+        path = self.cfg.get("capture", {}).get("file_path")
+        if not path:
+            raise RuntimeError("file capture needs capture.file_path")
+        self.frames = np.load(path, mmap_mode="r")
+        if self.frames.ndim != 4 or self.frames.shape[3] != 4:
+            raise RuntimeError(f"{path}: expected (N, h, w, 4) frames, got {self.frames.shape}")
+        self.index = 0
+
+    def grab_into(self, buf: FrameBuffer) -> FrameBuffer:
+        frame = self.frames[self.index % len(self.frames)]
+        if frame.shape[:2] != (buf.h, buf.w):
+            raise RuntimeError(f"Capture failed: recorded frame {frame.shape[:2]} != region {(buf.h, buf.w)}")
+        np.copyto(buf.pixels, frame)
+        self.index += 1
+        return buf
+
+
+class SyntheticBackend(CaptureBackend):
+    """
+    Renders frames from sim.SimulatedScreen; `screen` exposes press/release for fake input.
+    """
+
+    name = "synthetic"
+    screen = False
+
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(region, cfg)
+        from .sim import SimulatedScreen
+
+        h = region["h"]
+        self.sim = SimulatedScreen(w=region["w"], h=h, white_y=h * 2 // 5)
+
+    def grab_into(self, buf: FrameBuffer) -> FrameBuffer:
+        self.sim.grab_into(buf.pixels)
+        return buf
+
+
+BACKENDS: Dict[str, Type[CaptureBackend]] = {
+    MssBackend.name: MssBackend,
+    FileBackend.name: FileBackend,
+    SyntheticBackend.name: SyntheticBackend,
+    # X11 only; available() is False elsewhere
+    XShmBackend.name: XShmBackend,
+    XlibBackend.name: XlibBackend,
+}
+
+
+def available_backends(screen_only: bool = True, auto_only: bool = False) -> List[str]:
+    names = []
+    for name, cls in BACKENDS.items():
+        if screen_only and not cls.screen:
+            continue
+        if auto_only and not cls.auto:
+            continue
+        try:
+            if cls.available():
+                names.append(name)
+        except Exception:
+            pass
+    return names
+
+
+def probe_backends(
+    region: Dict[str, int],
+    cfg: Optional[Dict[str, Any]] = None,
+    names: Optional[List[str]] = None,
+    frames: int = 30,
+) -> Dict[str, float]:
+    """
+    Times each backend on the region (default: the ones "auto" may pick).
+    Returns {name: mean ms per frame}; backends that fail to open or grab are left out.
+    """
+    results: Dict[str, float] = {}
+    buf = FrameBuffer(region["w"], region["h"])
+    for name in names or available_backends(auto_only=True):
+        backend = None
+        try:
+            backend = BACKENDS[name](region, cfg)
+            backend.grab_into(buf)  # warm up (connections, shm attach)
+            t0 = time.perf_counter()
+            for _ in range(frames):
+                backend.grab_into(buf)
+            results[name] = (time.perf_counter() - t0) / frames * 1000.0
+        except Exception as e:
+            LOG.warn("capture", f"backend {name} failed probe: {e}")
+        finally:
+            if backend is not None:
+                backend.close()
+    return results
+
+
+def open_backend(region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> CaptureBackend:
+    """
+    Opens the backend named in capture.backend (default mss); "auto" probes
+    the available screen backends and keeps the fastest. Falls back to mss.
+    """
+    cfg = cfg or {}
+    name = cfg.get("capture", {}).get("backend", MssBackend.name)
+
+    if name == "auto":
+        timings = probe_backends(region, cfg)
+        if timings:
+            name = min(timings, key=timings.get)
+            LOG.info("capture", f"auto-selected backend {name}",
+                     **{k: round(v, 3) for k, v in timings.items()})
+        else:
+            name = MssBackend.name
+
+    cls = BACKENDS.get(name)
+    if cls is None or not cls.available():
+        LOG.warn("capture", f"backend {name} unavailable, using mss")
+        cls = MssBackend
+    return cls(region, cfg)
+
+
+TRIGGERS: Dict[str, Type[CaptureTrigger]] = {
+    PollTrigger.name: PollTrigger,
+    DamageTrigger.name: DamageTrigger,
+}
+
+
+def open_trigger(
+    region: Dict[str, int],
+    cfg: Optional[Dict[str, Any]] = None,
+    backend: Optional[CaptureBackend] = None,
+) -> CaptureTrigger:
+    """
+    Opens the trigger named in capture.trigger, falling back to polling when it
+    is unavailable or the backend doesn't read the real screen.
+    """
+    cfg = cfg or {}
+    name = cfg.get("capture", {}).get("trigger", "poll")
+    if name != PollTrigger.name and backend is not None and not backend.screen:
+        LOG.info("capture", f"{backend.name} backend is not a screen, {name} trigger not used")
+        name = PollTrigger.name
+
+    cls = TRIGGERS.get(name)
+    if cls is None or not cls.available():
+        LOG.warn("capture", f"trigger {name} unavailable, polling")
+        cls = PollTrigger
+    try:
+        return cls(region, cfg)
+    except Exception as e:
+        LOG.warn("capture", f"trigger {name} failed ({e}), polling")
+        return PollTrigger(region, cfg)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from client.config.config_io import load_config
+
+    parser = argparse.ArgumentParser(description="Probe capture backends on the configured region")
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    cfg = load_config()
+    region = cfg["capture"]["region"]
+    if not region:
+        raise SystemExit("No capture region set; calibrate first.")
+
+    print("available:", ", ".join(available_backends()))
+    timings = probe_backends(region, cfg, names=available_backends(), frames=args.frames)
+    for name, ms in sorted(timings.items(), key=lambda kv: kv[1]):
+        print(f"{name:>8}: {ms:.3f} ms/frame")
+    for rec in LOG.drain():
+        print(f"[{rec.level}] {rec.stage}: {rec.message}")
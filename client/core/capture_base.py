@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from .frame_pool import FrameBuffer
+
+
+class CaptureBackend:
+    """
+    One way of getting the calibrated region into a FrameBuffer.
+    Backends are bound to a region for their lifetime (XShm segments are
+    region-sized) and are used from a single thread.
+    """
+
+    name = "base"
+    screen = True   # False for stand-ins that don't read the real screen
+    auto = True     # offered to capture.backend "auto"
+
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> None:
+        self.region = region
+        self.cfg = cfg or {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def grab_into(self, buf: FrameBuffer) -> FrameBuffer:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class CaptureTrigger:
+    """
+    Decides when the loop captures. wait(timeout) blocks until the region may
+    have changed (True) or `timeout` seconds pass without a change (False).
+    Used from the loop thread only.
+    """
+
+    name = "base"
+
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> None:
+        self.region = region
+        self.cfg = cfg or {}
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def wait(self, timeout: float) -> bool:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class PollTrigger(CaptureTrigger):
+    """
+    Capture every tick; the scheduler alone sets the rate.
+    """
+
+    name = "poll"
+
+    def wait(self, timeout: float) -> bool:
+        return True
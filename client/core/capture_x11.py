@@ -0,0 +1,518 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from typing import Any, Dict, Optional
+
+from .capture_base import CaptureBackend, CaptureTrigger
+from .frame_pool import FrameBuffer
+
+
+def _has_display() -> bool:
+    return sys.platform.startswith("linux") and bool(os.environ.get("DISPLAY"))
+
+
+# ---------------------------------------------------------------------------
+# XShm: persistent MIT-SHM segment, XShmGetImage straight into shared memory
+# ---------------------------------------------------------------------------
+
+_ZPixmap = 2
+_AllPlanes = ctypes.c_ulong(-1).value   # ~0UL, as in Xlib.h
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+
+
+class _XImage(ctypes.Structure):
+    # leading fields of Xlib's XImage; we only read these
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+_XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+_libs: Optional[Dict[str, Any]] = None
+
+
+def _load_libs() -> Optional[Dict[str, Any]]:
+    global _libs
+    if _libs is not None:
+        return _libs or None
+
+    _libs = {}
+    paths = {name: ctypes.util.find_library(name) for name in ("X11", "Xext", "c")}
+    if not all(paths.values()):
+        return None
+    try:
+        x11 = ctypes.CDLL(paths["X11"])
+        xext = ctypes.CDLL(paths["Xext"])
+        libc = ctypes.CDLL(paths["c"], use_errno=True)
+    except OSError:
+        return None
+
+    vp, c_int, c_uint = ctypes.c_void_p, ctypes.c_int, ctypes.c_uint
+    x11.XOpenDisplay.restype = vp
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XCloseDisplay.argtypes = [vp]
+    x11.XDefaultScreen.argtypes = [vp]
+    x11.XRootWindow.restype = ctypes.c_ulong
+    x11.XRootWindow.argtypes = [vp, c_int]
+    x11.XDefaultVisual.restype = vp
+    x11.XDefaultVisual.argtypes = [vp, c_int]
+    x11.XDefaultDepth.argtypes = [vp, c_int]
+    x11.XSync.argtypes = [vp, c_int]
+    x11.XFree.argtypes = [vp]
+    x11.XSetErrorHandler.restype = vp
+    x11.XSetErrorHandler.argtypes = [_XErrorHandler]
+
+    xext.XShmQueryExtension.argtypes = [vp]
+    xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+    xext.XShmCreateImage.argtypes = [
+        vp, vp, c_uint, c_int, vp, ctypes.POINTER(_XShmSegmentInfo), c_uint, c_uint,
+    ]
+    xext.XShmAttach.argtypes = [vp, ctypes.POINTER(_XShmSegmentInfo)]
+    xext.XShmDetach.argtypes = [vp, ctypes.POINTER(_XShmSegmentInfo)]
+    xext.XShmGetImage.argtypes = [vp, ctypes.c_ulong, ctypes.POINTER(_XImage), c_int, c_int, ctypes.c_ulong]
+
+    libc.shmget.argtypes = [c_int, ctypes.c_size_t, c_int]
+    libc.shmat.restype = vp
+    libc.shmat.argtypes = [c_int, vp, c_int]
+    libc.shmdt.argtypes = [vp]
+    libc.shmctl.argtypes = [c_int, c_int, vp]
+
+    _libs.update(x11=x11, xext=xext, libc=libc)
+    return _libs
+
+
+# Xlib's default error handler exits the process; record the error instead.
+_x_errors = []
+
+
+@_XErrorHandler
+def _on_x_error(display, event):
+    _x_errors.append(event)
+    return 0
+
+
+class XShmBackend(CaptureBackend):
+    """
+    Captures with XShmGetImage into a shared-memory segment that lives as long
+    as the backend, then copies into the FrameBuffer (one memmove per frame,
+    no per-frame allocation, no socket transfer of the pixels).
+    """
+
+    name = "xshm"
+    # not probed by "auto" until tests/test_capture_x11.py has passed under Xvfb
+    auto = False
+
+    @classmethod
+    def available(cls) -> bool:
+        if not _has_display():
+            return False
+        libs = _load_libs()
+        if not libs:
+            return False
+        dpy = libs["x11"].XOpenDisplay(None)
+        if not dpy:
+            return False
+        try:
+            return bool(libs["xext"].XShmQueryExtension(dpy))
+        finally:
+            libs["x11"].XCloseDisplay(dpy)
+
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(region, cfg)
+        libs = _load_libs()
+        if not libs:
+            raise RuntimeError("XShm: libX11/libXext not found")
+        self._x11, self._xext, self._libc = libs["x11"], libs["xext"], libs["libc"]
+        self._x11.XSetErrorHandler(_on_x_error)
+
+        self._dpy = self._x11.XOpenDisplay(None)
+        if not self._dpy:
+            raise RuntimeError("XShm: cannot open display")
+        self._image = None
+        self._shminfo = _XShmSegmentInfo()
+        self._attached = False
+
+        try:
+            self._setup(region["w"], region["h"])
+        except Exception:
+            self.close()
+            raise
+
+    def _setup(self, w: int, h: int) -> None:
+        x11, xext, libc = self._x11, self._xext, self._libc
+        screen = x11.XDefaultScreen(self._dpy)
+        self._root = x11.XRootWindow(self._dpy, screen)
+        visual = x11.XDefaultVisual(self._dpy, screen)
+        depth = x11.XDefaultDepth(self._dpy, screen)
+
+        image = xext.XShmCreateImage(self._dpy, visual, depth, _ZPixmap, None, ctypes.byref(self._shminfo), w, h)
+        if not image:
+            raise RuntimeError("XShm: XShmCreateImage failed")
+        self._image = image
+        img = image.contents
+        if img.bits_per_pixel != 32 or img.bytes_per_line != w * 4:
+            raise RuntimeError(f"XShm: unsupported layout ({img.bits_per_pixel} bpp, {img.bytes_per_line} B/line)")
+
+        self._size = img.bytes_per_line * img.height
+        shmid = libc.shmget(_IPC_PRIVATE, self._size, _IPC_CREAT | 0o600)
+        if shmid < 0:
+            raise RuntimeError(f"XShm: shmget failed (errno {ctypes.get_errno()})")
+        self._shminfo.shmid = shmid
+        addr = libc.shmat(shmid, None, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            libc.shmctl(shmid, _IPC_RMID, None)
+            raise RuntimeError(f"XShm: shmat failed (errno {ctypes.get_errno()})")
+        self._shminfo.shmaddr = addr
+        self._shminfo.readOnly = 0
+        img.data = addr
+
+        if not xext.XShmAttach(self._dpy, ctypes.byref(self._shminfo)):
+            raise RuntimeError("XShm: XShmAttach failed")
+        x11.XSync(self._dpy, 0)
+        # segment is freed automatically once both sides detach
+        libc.shmctl(shmid, _IPC_RMID, None)
+        if _x_errors:
+            _x_errors.clear()
+            raise RuntimeError("XShm: attach rejected by the X server (remote display?)")
+        self._attached = True
+
+    def grab_into(self, buf: FrameBuffer) -> FrameBuffer:
+        r = self.region
+        if not self._xext.XShmGetImage(self._dpy, self._root, self._image, r["x"], r["y"], _AllPlanes):
+            raise RuntimeError("Capture failed: XShmGetImage")
+        if len(buf.raw) != self._size:
+            raise RuntimeError("Capture failed: buffer size does not match region")
+        dst = (ctypes.c_char * self._size).from_buffer(buf.raw)
+        ctypes.memmove(dst, self._shminfo.shmaddr, self._size)
+        return buf
+
+    def close(self) -> None:
+        if self._attached:
+            self._xext.XShmDetach(self._dpy, ctypes.byref(self._shminfo))
+            self._x11.XSync(self._dpy, 0)
+            self._attached = False
+        if self._shminfo.shmaddr:
+            self._libc.shmdt(self._shminfo.shmaddr)
+            self._shminfo.shmaddr = None
+        if self._image:
+            # data points into shm (already detached), free only the struct
+            self._image.contents.data = None
+            self._x11.XFree(self._image)
+            self._image = None
+        if self._dpy:
+            self._x11.XCloseDisplay(self._dpy)
+            self._dpy = None
+
+
+# ---------------------------------------------------------------------------
+# python-xlib: plain GetImage over the X connection (no MIT-SHM needed)
+# ---------------------------------------------------------------------------
+
+class XlibBackend(CaptureBackend):
+    name = "xlib"
+    auto = False
+
+    @classmethod
+    def available(cls) -> bool:
+        if not _has_display():
+            return False
+        try:
+            import Xlib.display  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(region, cfg)
+        from Xlib import X, display
+
+        self._X = X
+        self._display = display.Display()
+        self._root = self._display.screen().root
+
+    def grab_into(self, buf: FrameBuffer) -> FrameBuffer:
+        r = self.region
+        try:
+            # the protocol's plane mask is 32 bits, unlike Xlib's unsigned long
+            image = self._root.get_image(r["x"], r["y"], r["w"], r["h"], self._X.ZPixmap, 0xFFFFFFFF)
+            memoryview(buf.raw)[:] = image.data
+        except Exception as e:
+            raise RuntimeError(f"Capture failed: {e}")
+        return buf
+
+    def close(self) -> None:
+        self._display.close()
+
+
+# ---------------------------------------------------------------------------
+# XDamage: capture only when the server reports damage inside the region
+# ---------------------------------------------------------------------------
+
+_XDamageReportDeltaRectangles = 1
+_XDamageNotify = 0
+
+
+class _XRectangle(ctypes.Structure):
+    _fields_ = [
+        ("x", ctypes.c_short),
+        ("y", ctypes.c_short),
+        ("width", ctypes.c_ushort),
+        ("height", ctypes.c_ushort),
+    ]
+
+
+class _XDamageNotifyEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("serial", ctypes.c_ulong),
+        ("send_event", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("drawable", ctypes.c_ulong),
+        ("damage", ctypes.c_ulong),
+        ("level", ctypes.c_int),
+        ("more", ctypes.c_int),
+        ("timestamp", ctypes.c_ulong),
+        ("area", _XRectangle),
+        ("geometry", _XRectangle),
+    ]
+
+
+# XEvent is a union padded to 24 longs
+_XEvent = ctypes.c_long * 24
+
+_damage_lib: Optional[Any] = None
+
+
+def _load_damage() -> Optional[Any]:
+    global _damage_lib
+    if _damage_lib is not None:
+        return _damage_lib or None
+
+    _damage_lib = False
+    libs = _load_libs()
+    path = ctypes.util.find_library("Xdamage")
+    if not libs or not path:
+        return None
+    try:
+        xdamage = ctypes.CDLL(path)
+    except OSError:
+        return None
+
+    vp, c_int, c_ulong = ctypes.c_void_p, ctypes.c_int, ctypes.c_ulong
+    xdamage.XDamageQueryExtension.argtypes = [vp, ctypes.POINTER(c_int), ctypes.POINTER(c_int)]
+    xdamage.XDamageCreate.restype = c_ulong
+    xdamage.XDamageCreate.argtypes = [vp, c_ulong, c_int]
+    xdamage.XDamageDestroy.argtypes = [vp, c_ulong]
+    xdamage.XDamageSubtract.argtypes = [vp, c_ulong, c_ulong, c_ulong]
+
+    x11 = libs["x11"]
+    x11.XPending.argtypes = [vp]
+    x11.XNextEvent.argtypes = [vp, ctypes.POINTER(_XEvent)]
+    x11.XConnectionNumber.argtypes = [vp]
+    x11.XFlush.argtypes = [vp]
+
+    _damage_lib = xdamage
+    return xdamage
+
+
+class DamageTrigger(CaptureTrigger):
+    """
+    Subscribes to XDamage on the root window and wakes the loop only for
+    damage that overlaps the capture region.
+    - DeltaRectangles reporting, with the damage subtracted after each batch,
+      so a busy screen yields one batch of events per wait, not a flood
+    - wait() sleeps in select() on the X connection: no CPU while idle
+    """
+
+    name = "damage"
+
+    @classmethod
+    def available(cls) -> bool:
+        if not _has_display() or not _load_damage():
+            return False
+        x11 = _load_libs()["x11"]
+        dpy = x11.XOpenDisplay(None)
+        if not dpy:
+            return False
+        try:
+            ev, err = ctypes.c_int(), ctypes.c_int()
+            return bool(_damage_lib.XDamageQueryExtension(dpy, ctypes.byref(ev), ctypes.byref(err)))
+        finally:
+            x11.XCloseDisplay(dpy)
+
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(region, cfg)
+        self._xdamage = _load_damage()
+        if not self._xdamage:
+            raise RuntimeError("XDamage: libXdamage not found")
+        self._x11 = _load_libs()["x11"]
+        self._x11.XSetErrorHandler(_on_x_error)
+
+        self._dpy = self._x11.XOpenDisplay(None)
+        if not self._dpy:
+            raise RuntimeError("XDamage: cannot open display")
+        self._damage = 0
+        ev, err = ctypes.c_int(), ctypes.c_int()
+        if not self._xdamage.XDamageQueryExtension(self._dpy, ctypes.byref(ev), ctypes.byref(err)):
+            self.close()
+            raise RuntimeError("XDamage: extension not supported by the X server")
+        self._event_type = ev.value + _XDamageNotify
+
+        root = self._x11.XRootWindow(self._dpy, self._x11.XDefaultScreen(self._dpy))
+        self._damage = self._xdamage.XDamageCreate(self._dpy, root, _XDamageReportDeltaRectangles)
+        self._x11.XFlush(self._dpy)
+        self._fd = self._x11.XConnectionNumber(self._dpy)
+        self._event = _XEvent()
+        self._notify = ctypes.cast(ctypes.byref(self._event), ctypes.POINTER(_XDamageNotifyEvent)).contents
+
+        self.events = 0   # damage events seen (anywhere on screen)
+        self.hits = 0     # waits ended by damage inside the region
+
+    def _overlaps(self, area: _XRectangle) -> bool:
+        r = self.region
+        return (area.x < r["x"] + r["w"] and r["x"] < area.x + area.width
+                and area.y < r["y"] + r["h"] and r["y"] < area.y + area.height)
+
+    def _drain(self) -> bool:
+        x11 = self._x11
+        hit = False
+        seen = False
+        while x11.XPending(self._dpy):
+            x11.XNextEvent(self._dpy, ctypes.byref(self._event))
+            if self._notify.type != self._event_type:
+                continue
+            seen = True
+            self.events += 1
+            if not hit and self._overlaps(self._notify.area):
+                hit = True
+        if seen:
+            # clear the accumulated damage so the next change reports again
+            self._xdamage.XDamageSubtract(self._dpy, self._damage, 0, 0)
+            x11.XFlush(self._dpy)
+        return hit
+
+    def wait(self, timeout: float) -> bool:
+        deadline = time.perf_counter() + timeout
+        while True:
+            if self._drain():
+                self.hits += 1
+                return True
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                return False
+            select.select([self._fd], [], [], remaining)
+
+    def close(self) -> None:
+        if self._dpy:
+            if self._damage:
+                self._xdamage.XDamageDestroy(self._dpy, self._damage)
+                self._damage = 0
+            self._x11.XCloseDisplay(self._dpy)
+            self._dpy = None
+
+
+if __name__ == "__main__":
+    # Scripted check for Xvfb (e.g. `xvfb-run -s "-screen 0 640x480x24" python -m client.core.capture_x11`):
+    # a window inside the region redraws for a while, then stays still; the
+    # trigger should fire during the redraw phase and (almost) never while idle.
+    import argparse
+    import threading
+
+    parser = argparse.ArgumentParser(description="XDamage trigger check with a scripted redrawing window")
+    parser.add_argument("--seconds", type=float, default=2.0, help="length of each phase")
+    parser.add_argument("--hz", type=float, default=60.0, help="redraw rate in the busy phase")
+    args = parser.parse_args()
+
+    if not DamageTrigger.available():
+        raise SystemExit("XDamage not available (no DISPLAY, libXdamage or server extension)")
+
+    libs = _load_libs()
+    x11 = libs["x11"]
+    x11.XInitThreads()
+    vp, c_ulong, c_int, c_uint = ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_uint
+    x11.XCreateSimpleWindow.restype = c_ulong
+    x11.XCreateSimpleWindow.argtypes = [vp, c_ulong, c_int, c_int, c_uint, c_uint, c_uint, c_ulong, c_ulong]
+    x11.XMapWindow.argtypes = [vp, c_ulong]
+    x11.XDefaultGC.restype = vp
+    x11.XDefaultGC.argtypes = [vp, c_int]
+    x11.XSetForeground.argtypes = [vp, vp, c_ulong]
+    x11.XFillRectangle.argtypes = [vp, c_ulong, vp, c_int, c_int, c_uint, c_uint]
+    x11.XDestroyWindow.argtypes = [vp, c_ulong]
+
+    region = {"x": 20, "y": 20, "w": 95, "h": 380}
+    phase = {"name": "settle"}
+    counts = {"busy": 0, "idle": 0}
+    stop = threading.Event()
+
+    def redraw() -> None:
+        dpy = x11.XOpenDisplay(None)
+        screen = x11.XDefaultScreen(dpy)
+        root = x11.XRootWindow(dpy, screen)
+        win = x11.XCreateSimpleWindow(dpy, root, region["x"], region["y"], region["w"], region["h"], 0, 0, 0x808080)
+        x11.XMapWindow(dpy, win)
+        x11.XFlush(dpy)
+        gc = x11.XDefaultGC(dpy, screen)
+        y = 0
+        while not stop.is_set():
+            if phase["name"] == "busy":
+                # moving black bar on grey, like the minigame
+                x11.XSetForeground(dpy, gc, 0x808080)
+                x11.XFillRectangle(dpy, win, gc, 0, y, region["w"], 3)
+                y = (y + 5) % (region["h"] - 3)
+                x11.XSetForeground(dpy, gc, 0x000000)
+                x11.XFillRectangle(dpy, win, gc, 0, y, region["w"], 3)
+                x11.XFlush(dpy)
+            time.sleep(1.0 / args.hz)
+        x11.XDestroyWindow(dpy, win)
+        x11.XCloseDisplay(dpy)
+
+    trigger = DamageTrigger(region)
+    t = threading.Thread(target=redraw, daemon=True)
+    t.start()
+
+    # let the window map, then swallow its initial exposure damage
+    end = time.perf_counter() + 0.5
+    while time.perf_counter() < end:
+        trigger.wait(0.05)
+
+    for name in ("busy", "idle"):
+        phase["name"] = name
+        end = time.perf_counter() + args.seconds
+        while time.perf_counter() < end:
+            if trigger.wait(end - time.perf_counter()):
+                counts[name] += 1
+    stop.set()
+    t.join()
+    trigger.close()
+
+    print(f"busy phase: {counts['busy']} captures in {args.seconds:.1f} s ({args.hz:.0f} Hz redraw)")
+    print(f"idle phase: {counts['idle']} captures in {args.seconds:.1f} s")
+    print(f"damage events seen: {trigger.events}")
@@ -1,11 +1,20 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Callable, Optional
 import pyautogui
 import time
 
+from .actuator import PwmActuator
 from .vision_simple import DetectionResult
 
 
+def _mouse_down() -> None:
+    pyautogui.mouseDown(button="left")
+
+
+def _mouse_up() -> None:
+    pyautogui.mouseUp(button="left")
+
+
 class Controller:
     """
     No-deadzone continuous controller:
@@ -13,11 +22,23 @@ class Controller:
     - Uses extremely small micro-holds
     - Very fast update rate
     - Tracks the white line closely without overshoot
+
+    With pwm_period set, holds are emitted by a PwmActuator thread:
+    update() only picks a duty cycle and never sleeps.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        pwm_period: Optional[float] = None,
+        press: Optional[Callable[[], None]] = None,
+        release: Optional[Callable[[], None]] = None,
+    ) -> None:
         pyautogui.PAUSE = 0
 
+        # input path (swappable for calibration / fake backends)
+        self.press = press or _mouse_down
+        self.release = release or _mouse_up
+
         # You can tune threshold and cooldown to fit the game's responsiveness!!!
         # tuning
         self.min_hold = 0.002      # smallest possible hold
@@ -25,21 +46,77 @@ class Controller:
         self.cooldown = 0.0015     # rate limit for toggles
         self.threshold = 2         # pixels of current and past inputs before toggling hold state
 
+        self.strength_px = 40.0    # distance at which the micro-hold reaches max_hold
+
+        # results whose frame is older than this (seconds) are treated as "no detection"
+        self.max_age: Optional[float] = None
+        self.stale = 0             # results rejected for age
+
         self.last_action = time.monotonic()
         self.holding = False       # whether we currently have the left mouse held down
 
+        self.actuator: Optional[PwmActuator] = None
+        if pwm_period:
+            self.actuator = PwmActuator(self.press, self.release, period=pwm_period)
+
     def reset(self) -> None:
-        if self.holding:
-            pyautogui.mouseUp(button="left")
-            self.holding = False
-        else:
-            pyautogui.mouseUp(button="left")
+        if self.actuator is not None:
+            self.actuator.stop()
+        self.release()
+        self.holding = False
+
+    def hold_level(self) -> float:
+        """
+        Current hold state as 0..1: the PWM duty, or 0/1 in toggle mode.
+        """
+        if self.actuator is not None:
+            return self.actuator.duty
+        return 1.0 if self.holding else 0.0
+
+    def hold_fraction(self, d: float) -> float:
+        """
+        Duty cycle for a distance: min_hold..max_hold per PWM period, scaled by d.
+        """
+        if d <= self.threshold:
+            return 0.0
+        strength = min(1.0, d / self.strength_px)
+        hold_time = self.min_hold + strength * (self.max_hold - self.min_hold)
+        return hold_time / self.actuator.period
+
+    def _update_pwm(self, result: Optional[DetectionResult]) -> None:
+        actuator = self.actuator
+        if not result or not result.active or result.distance is None:
+            actuator.set_duty(0.0)
+            return
+
+        d = result.distance
+        if -self.threshold <= d <= self.threshold:
+            # inside the band, keep the current duty
+            return
+
+        if not actuator.is_running():
+            actuator.start()
+        actuator.set_duty(self.hold_fraction(d))
+
+    def is_stale(self, result: Optional[DetectionResult]) -> bool:
+        if not self.max_age or result is None or result.captured_at is None:
+            return False
+        return time.perf_counter() - result.captured_at > self.max_age
 
     def update(self, result: Optional[DetectionResult]) -> None:
+        if self.is_stale(result):
+            # never steer from an old frame; fall through to the "lost" path and release
+            self.stale += 1
+            result = None
+
+        if self.actuator is not None:
+            self._update_pwm(result)
+            return
+
         # If detection lost or inactive, makes sure we release
         if not result or not result.active or result.distance is None:
             if self.holding:
-                pyautogui.mouseUp(button="left")
+                self.release()
                 self.holding = False
                 self.last_action = time.monotonic()
             return
@@ -55,7 +132,7 @@ class Controller:
         if d < -self.threshold:
             # bar ABOVE white - lower - RELEASE if currently holding
             if self.holding:
-                pyautogui.mouseUp(button="left")
+                self.release()
                 self.holding = False
                 self.last_action = now
             return
@@ -74,7 +151,7 @@ class Controller:
                         # ignore move failures 
                         pass
 
-                pyautogui.mouseDown(button="left")
+                self.press()
                 self.holding = True
                 self.last_action = now
             return
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .log_ring import LOG
+from .vision_simple import DetectParams, DetectWork, DetectionResult, detect_zone_and_bar_pixels
+
+
+@dataclass(frozen=True)
+class FidelityLevel:
+    """
+    One detection quality step: every `col_stride`-th column and `row_step`-th
+    row of the frame, with the crop band narrowed around its centre by `band`.
+    """
+    name: str
+    col_stride: int = 1
+    row_step: int = 1
+    band: float = 1.0
+
+
+# cheapest accuracy loss first: the band is uniform across columns, so column
+# subsampling costs little; row decimation can skip a 1 px white line and comes last
+LEVELS = (
+    FidelityLevel("full"),
+    FidelityLevel("cols/2", col_stride=2),
+    FidelityLevel("cols/4", col_stride=4),
+    FidelityLevel("cols/4 band/2", col_stride=4, band=0.5),
+    FidelityLevel("cols/4 band/2 rows/2", col_stride=4, row_step=2, band=0.5),
+)
+
+
+def _level_params(params: DetectParams, level: FidelityLevel, w: int) -> DetectParams:
+    centre = (params.crop_left + params.crop_right) / 2.0
+    half = (params.crop_right - params.crop_left) / 2.0 * level.band
+    left, right = centre - half, centre + half
+
+    # fewer columns per row means fewer pixels to reach min_signal
+    vw = len(range(0, w, level.col_stride))
+    cols = int(vw * right) - int(vw * left)
+    full_cols = int(w * params.crop_right) - int(w * params.crop_left)
+    min_signal = max(1, round(params.min_signal * cols / max(1, full_cols)))
+    return replace(params, crop_left=left, crop_right=right, min_signal=min_signal)
+
+
+class FidelityWork:
+    """
+    DetectWork for one degraded level, sized for the strided view of the frame.
+    """
+
+    def __init__(self, w: int, h: int, params: DetectParams, level: FidelityLevel) -> None:
+        self.level = level
+        vw = len(range(0, w, level.col_stride))
+        vh = len(range(0, h, level.row_step))
+        self.work = DetectWork(vw, vh, _level_params(params, level, w))
+
+    def detect(self, pixels: np.ndarray) -> DetectionResult:
+        lv = self.level
+        view = pixels if lv.col_stride == 1 and lv.row_step == 1 else pixels[::lv.row_step, ::lv.col_stride]
+        r = detect_zone_and_bar_pixels(view, self.work)
+        if not r.active or lv.row_step == 1:
+            return r
+        white_y = r.white_y * lv.row_step
+        bar_y = r.bar_y * lv.row_step
+        return DetectionResult(white_y, bar_y, float(white_y - bar_y), True)
+
+
+class FidelityController:
+    """
+    Steps detection quality down when detection runs over budget and back up
+    when there is headroom, so the loop rate holds under load.
+    - down: `down_after` consecutive ticks over budget
+    - up: `up_after` consecutive ticks where the detection time, scaled by the
+      cost ratio of the next better level, fits in headroom * budget; the
+      ratio is measured right after each step down, so both sides saw the same load
+    - no step down while the last one is still being measured; one that
+      saves under `min_ratio` is undone and not retried for `retry_after` ticks
+    Every step is logged; level 0 is the loop's normal detector.
+    """
+
+    def __init__(
+        self,
+        w: int,
+        h: int,
+        params: DetectParams,
+        budget: float,
+        levels: Sequence[FidelityLevel] = LEVELS,
+        down_after: int = 3,
+        up_after: int = 60,
+        headroom: float = 0.7,
+        min_ratio: float = 1.05,
+        retry_after: int = 600,
+    ) -> None:
+        self.levels = list(levels)
+        self.works: List[Optional[FidelityWork]] = [None] + [
+            FidelityWork(w, h, params, lv) for lv in self.levels[1:]
+        ]
+        self.budget = budget
+        self.down_after = down_after
+        self.up_after = up_after
+        self.headroom = headroom
+        self.min_ratio = min_ratio
+        self.retry_after = retry_after
+
+        self.level = 0
+        self.steps = 0
+        self._over = 0
+        self._under = 0
+        # smoothed busy time at the current level (seconds)
+        self._cost: Optional[float] = None
+        # ticks left before another step down may be tried
+        self._hold_off = 0
+        # ratio[i]: busy time at level i - 1 over level i (guess until measured)
+        self.ratio: List[float] = [2.0] * len(self.levels)
+        self._probe: List[float] = []
+        self._probe_base: Optional[float] = None
+        self.probe_ticks = 8
+
+    def set_kernel(self, row_counts: Any) -> None:
+        for fw in self.works[1:]:
+            fw.work.row_counts = row_counts
+
+    def detect(self, pixels: np.ndarray) -> DetectionResult:
+        return self.works[self.level].detect(pixels)
+
+    def observe(self, busy: float) -> None:
+        """
+        Feed one tick's detection time (seconds); the rest of the tick
+        (capture, control) does not change with the level.
+        """
+        lvl = self.level
+        prev = self._cost
+        self._cost = busy if prev is None else prev + 0.1 * (busy - prev)
+        if self._hold_off:
+            self._hold_off -= 1
+
+        if self._probe_base is not None:
+            self._probe.append(busy)
+            if len(self._probe) >= self.probe_ticks:
+                here = sorted(self._probe)[len(self._probe) // 2]
+                self.ratio[lvl] = max(1.0, self._probe_base / here) if here > 0 else 1.0
+                self._probe_base = None
+                if self.ratio[lvl] < self.min_ratio:
+                    # the step bought nothing: keep the better level and stop
+                    # degrading until the load may have changed
+                    self._hold_off = self.retry_after
+                    self._step(lvl - 1, busy)
+                    return
+
+        if busy > self.budget:
+            self._over += 1
+            self._under = 0
+            # no further step until the last one has been measured
+            probing = self._probe_base is not None
+            if self._over >= self.down_after and lvl + 1 < len(self.levels) and not (probing or self._hold_off):
+                self._step(lvl + 1, busy)
+            return
+        self._over = 0
+
+        if lvl == 0:
+            return
+        if busy * self.ratio[lvl] < self.budget * self.headroom:
+            self._under += 1
+            if self._under >= self.up_after:
+                self._step(lvl - 1, busy)
+        else:
+            self._under = 0
+
+    def _step(self, level: int, busy: float) -> None:
+        direction = "down" if level > self.level else "up"
+        # measure what this step saves while the load is still the same
+        self._probe_base = self._cost if direction == "down" else None
+        self._probe = []
+        self._cost = None
+        self.level = level
+        self.steps += 1
+        self._over = 0
+        self._under = 0
+        LOG.info("fidelity", f"step {direction} to {self.levels[level].name}",
+                 to_level=level, busy_ms=round(busy * 1000.0, 3), budget_ms=round(self.budget * 1000.0, 3))
+
+
+def fidelity_from_config(cfg: Dict[str, Any], w: int, h: int, params: DetectParams) -> Optional[FidelityController]:
+    vision = cfg.get("vision", {})
+    if not vision.get("adaptive_fidelity"):
+        return None
+    if vision.get("pyramid_factor", 1) > 1 and h >= vision.get("pyramid_min_height", 800):
+        # the levels degrade the full-resolution scan; on regions this tall the
+        # pyramid detector is already cheaper than most of them
+        LOG.info("fidelity", "adaptive fidelity off: region uses the pyramid detector", h=h)
+        return None
+    budget_ms = vision.get("tick_budget_ms", 0)
+    if not budget_ms:
+        # half the tick interval for detection, leaving the rest for capture and slack
+        budget_ms = 500.0 / cfg.get("control", {}).get("loop_hz", 90)
+    return FidelityController(w, h, params, budget_ms / 1000.0)
+
+
+def replay_cost(
+    frames: Sequence[np.ndarray],
+    params: Optional[DetectParams] = None,
+    levels: Sequence[FidelityLevel] = LEVELS,
+) -> List[Dict[str, Any]]:
+    """
+    Runs every level over the same frames and compares it with full-fidelity
+    detection: activity mismatches, worst/mean line error and time per frame.
+    """
+    params = params or DetectParams()
+    h, w = frames[0].shape[:2]
+    full_work = DetectWork(w, h, params)
+    reference = [detect_zone_and_bar_pixels(px, full_work) for px in frames]
+
+    rows = []
+    for lv in levels:
+        fw = FidelityWork(w, h, params, lv)
+        t0 = time.perf_counter()
+        results = [fw.detect(px) for px in frames]
+        us = (time.perf_counter() - t0) / len(frames) * 1e6
+
+        mismatched = 0
+        errors: List[int] = []
+        for ref, got in zip(reference, results):
+            if ref.active != got.active:
+                mismatched += 1
+            elif ref.active:
+                errors.append(max(abs(ref.white_y - got.white_y), abs(ref.bar_y - got.bar_y)))
+        rows.append({
+            "level": lv.name,
+            "us_per_frame": round(us, 1),
+            "mismatched": mismatched,
+            "mean_err_px": round(float(np.mean(errors)), 2) if errors else 0.0,
+            "max_err_px": max(errors) if errors else 0,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    # Accuracy cost of each level against full-fidelity replay
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Accuracy/latency of each fidelity level")
+    parser.add_argument("--recording", help="recording dir (see client.debug.tune_vision); default: synthetic frames")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--w", type=int, default=190)
+    parser.add_argument("--h", type=int, default=760)
+    args = parser.parse_args()
+
+    if args.recording:
+        frames = np.load(f"{args.recording}/frames.npy")
+    else:
+        from .sim import render_frame
+
+        rng = np.random.default_rng(0)
+        frames = []
+        for _ in range(args.frames):
+            frame = render_frame(args.w, args.h, int(rng.integers(10, args.h - 10)),
+                                 int(rng.integers(0, args.h - 3))).astype(np.int16)
+            frame[..., :3] += rng.normal(0, 14, frame[..., :3].shape).astype(np.int16)
+            frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+
+    print(f"{'level':>22} {'us/frame':>9} {'mismatch':>8} {'mean_err':>8} {'max_err':>7}")
+    for row in replay_cost(frames):
+        print(f"{row['level']:>22} {row['us_per_frame']:>9} {row['mismatched']:>8} "
+              f"{row['mean_err_px']:>8} {row['max_err_px']:>7}")
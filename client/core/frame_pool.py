@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class FrameBuffer:
+    """
+    One preallocated BGRA frame. `raw` is the backing bytearray,
+    `pixels` an (h, w, 4) uint8 view over the same memory,
+    `captured_at` the perf_counter() time the current contents were grabbed.
+    Whoever holds the buffer calls release() when done with it.
+    """
+
+    def __init__(self, w: int, h: int, pool: Optional["FramePool"] = None) -> None:
+        self.w = w
+        self.h = h
+        self.raw = bytearray(w * h * 4)
+        self.pixels = np.frombuffer(self.raw, dtype=np.uint8).reshape((h, w, 4))
+        self.captured_at = 0.0
+        self._pool = pool
+
+    def release(self) -> None:
+        if self._pool is not None:
+            self._pool.release(self)
+
+
+class FramePool:
+    """
+    Fixed set of region-sized frame buffers recycled between capture and consumers.
+    acquire() never allocates: when every buffer is still held (e.g. the GUI lags)
+    it returns None and counts the event in `exhausted`.
+    """
+
+    def __init__(self, w: int, h: int, size: int = 4) -> None:
+        self.w = w
+        self.h = h
+        self.size = size
+        self.exhausted = 0
+
+        self._lock = threading.Lock()
+        self._free: List[FrameBuffer] = [FrameBuffer(w, h, self) for _ in range(size)]
+
+    def acquire(self) -> Optional[FrameBuffer]:
+        with self._lock:
+            if not self._free:
+                self.exhausted += 1
+                return None
+            return self._free.pop()
+
+    def release(self, buf: FrameBuffer) -> None:
+        with self._lock:
+            if buf not in self._free:
+                self._free.append(buf)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            free = len(self._free)
+        return {"size": self.size, "in_use": self.size - free, "exhausted": self.exhausted}
+
+
+if __name__ == "__main__":
+    # Steady-state allocation check: synthetic capture -> detect -> release
+    # (tests/test_frame_pool.py runs the same check through ControlLoop.tick)
+    import sys
+    import tracemalloc
+
+    from .sim import render_frame
+    from .vision_simple import DetectWork, detect_zone_and_bar_pixels
+
+    W, H, FRAMES = 95, 380, 2000
+    pool = FramePool(W, H, size=4)
+    work = DetectWork(W, H)
+
+    def tick(i: int) -> None:
+        buf = pool.acquire()
+        render_frame(W, H, 150, 100 + i % 200, out=buf.pixels)
+        detect_zone_and_bar_pixels(buf.pixels, work)
+        buf.release()
+
+    for i in range(100):  # warm up caches / lazy imports
+        tick(i)
+
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for i in range(FRAMES):
+        tick(i)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    frame_bytes = W * H * 4
+    print(f"frames={FRAMES} frame_bytes={frame_bytes}")
+    print(f"retained={current - base} B, peak_over_base={peak - base} B")
+    if current - base < 1024 and peak - base < frame_bytes // 10:
+        print("OK")
+    else:
+        print("FAIL: per-frame allocations")
+        sys.exit(1)
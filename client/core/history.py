@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .vision_simple import DetectionResult
+
+
+# (name, dtype, value stored for "no detection")
+COLUMNS = (
+    ("t", np.float64, np.nan),
+    ("white_y", np.int16, -1),
+    ("bar_y", np.int16, -1),
+    ("distance", np.float32, np.nan),
+    ("active", np.bool_, False),
+    ("hold", np.float32, 0.0),   # PWM duty, or 0/1 for the toggle controller
+)
+
+
+class ResultHistory:
+    """
+    Fixed-capacity ring of detection results, one NumPy array per field
+    (21 bytes a row: 5 minutes at 120 Hz is ~750 KB).
+    - One writer (the capture thread) appends without allocating
+    - Rows are addressed by sequence number; `count` only grows
+    - Readers copy out everything after the sequence they last saw
+    """
+
+    # rows a reader stays away from the write position (the writer may be mid-lap)
+    READ_MARGIN = 64
+
+    def __init__(self, capacity: int = 120 * 60 * 5) -> None:
+        self.capacity = capacity
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.full(capacity, empty, dtype=dtype) for name, dtype, empty in COLUMNS
+        }
+        self.count = 0
+        # bound up front so append() does no dict lookups
+        (self._t, self._white_y, self._bar_y,
+         self._distance, self._active, self._hold) = self.columns.values()
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def append(self, result: DetectionResult, hold: float = 0.0, t: Optional[float] = None) -> None:
+        i = self.count % self.capacity
+        self._t[i] = time.perf_counter() if t is None else t
+        if result.active:
+            self._white_y[i] = result.white_y
+            self._bar_y[i] = result.bar_y
+            self._distance[i] = result.distance
+        else:
+            self._white_y[i] = -1
+            self._bar_y[i] = -1
+            self._distance[i] = np.nan
+        self._active[i] = result.active
+        self._hold[i] = hold
+        # publish the row last: readers only look below count
+        self.count += 1
+
+    def read_since(self, seq: int) -> Tuple[int, Dict[str, np.ndarray]]:
+        """
+        Copies of every column for rows seq..count-1 (clamped to what the
+        ring still holds). Returns (next seq, columns).
+        """
+        end = self.count
+        start = max(seq, end - self.capacity + self.READ_MARGIN, 0)
+        if start >= end:
+            return end, {name: arr[:0].copy() for name, arr in self.columns.items()}
+
+        a, b = start % self.capacity, end % self.capacity
+        if a < b:
+            out = {name: arr[a:b].copy() for name, arr in self.columns.items()}
+        else:
+            out = {name: np.concatenate((arr[a:], arr[:b])) for name, arr in self.columns.items()}
+        return end, out
+
+    def nbytes(self) -> int:
+        return sum(arr.nbytes for arr in self.columns.values())
+
+
+def history_from_config(cfg: Dict) -> ResultHistory:
+    control = cfg.get("control", {})
+    rate = control.get("max_hz", 240) if control.get("adaptive_tick") else control.get("loop_hz", 90)
+    seconds = cfg.get("debug", {}).get("history_seconds", 300)
+    return ResultHistory(capacity=max(1, int(seconds * rate)))
+
+
+if __name__ == "__main__":
+    # Memory and allocation check: append must not allocate in steady state
+    import tracemalloc
+
+    hist = ResultHistory(120 * 60 * 5)
+    print(f"capacity {hist.capacity} rows, {hist.nbytes() / 1e6:.2f} MB")
+
+    results = [DetectionResult(150, 150 + d, float(-d), True) for d in range(-20, 21)]
+    results.append(DetectionResult(None, None, None, False))
+    for k in range(1000):
+        hist.append(results[k % len(results)], 0.5)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for k in range(100000):
+        hist.append(results[k % len(results)], 0.5, t=float(k))
+    dt = time.perf_counter() - t0
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"append: {dt / 100000 * 1e6:.2f} us, traced peak {peak} bytes")
+
+    seq, cols = hist.read_since(hist.count - 10)
+    print(f"read_since: {len(cols['t'])} rows up to seq {seq}, last distance {cols['distance'][-1]}")
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from . import vision_simple as vs
+from .log_ring import LOG
+from .sim import render_frame
+
+
+class RowCountKernel:
+    """
+    The hot loop of detection: per-row white/black pixel counts over the crop.
+    Called as kernel(cropped, work, rows) with cropped an (n, cw, 4) uint8 view;
+    writes work.white_counts[rows] / work.black_counts[rows].
+    Every kernel must match vision_simple.row_counts_numpy bit for bit.
+    """
+
+    name = "base"
+
+    @classmethod
+    def available(cls) -> bool:
+        return True
+
+    def __call__(self, cropped: np.ndarray, work: vs.DetectWork, rows: slice = slice(None)) -> None:
+        raise NotImplementedError
+
+
+class NumpyKernel(RowCountKernel):
+    name = "numpy"
+
+    def __call__(self, cropped: np.ndarray, work: vs.DetectWork, rows: slice = slice(None)) -> None:
+        vs.row_counts_numpy(cropped, work, rows)
+
+
+class NumbaKernel(RowCountKernel):
+    """
+    Single pass per pixel: sum, both comparisons and both counts in one loop.
+    """
+
+    name = "numba"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import numba  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def __init__(self) -> None:
+        global _numba_fn
+        if _numba_fn is None:
+            _numba_fn = _compile_numba()
+        self._fn = _numba_fn
+
+    def __call__(self, cropped: np.ndarray, work: vs.DetectWork, rows: slice = slice(None)) -> None:
+        self._fn(cropped, work.params.white_threshold, work.params.black_threshold,
+                 work.white_counts[rows], work.black_counts[rows])
+
+
+_numba_fn = None
+
+
+def _compile_numba():
+    from numba import njit
+
+    @njit(cache=True, nogil=True)
+    def row_counts(cropped, white_thr, black_thr, white_out, black_out):
+        n, cw = cropped.shape[0], cropped.shape[1]
+        for y in range(n):
+            wc = 0
+            bc = 0
+            for x in range(cw):
+                b = np.int32(cropped[y, x, 0]) + np.int32(cropped[y, x, 1]) + np.int32(cropped[y, x, 2])
+                if b > white_thr:
+                    wc += 1
+                elif b < black_thr:
+                    bc += 1
+            white_out[y] = wc
+            black_out[y] = bc
+
+    return row_counts
+
+
+class OpenCVKernel(RowCountKernel):
+    """
+    cv2.transform for B+G+R, cv2.threshold for the masks, cv2.reduce for the
+    row sums. Values stay exact in float32 (sums <= 765, counts <= width).
+    """
+
+    name = "opencv"
+
+    @classmethod
+    def available(cls) -> bool:
+        try:
+            import cv2  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def __init__(self) -> None:
+        import cv2
+
+        self.cv2 = cv2
+        self.weights = np.array([[1.0, 1.0, 1.0, 0.0]], dtype=np.float32)
+        # scratch per crop shape, allocated once
+        self._scratch: Dict[Tuple[int, int], Tuple[np.ndarray, ...]] = {}
+
+    def _buffers(self, n: int, cw: int) -> Tuple[np.ndarray, ...]:
+        bufs = self._scratch.get((n, cw))
+        if bufs is None:
+            bufs = (
+                np.empty((n, cw, 4), dtype=np.float32),
+                np.empty((n, cw), dtype=np.float32),
+                np.empty((n, cw), dtype=np.float32),
+                np.empty((n, 1), dtype=np.float32),
+            )
+            self._scratch[(n, cw)] = bufs
+        return bufs
+
+    def __call__(self, cropped: np.ndarray, work: vs.DetectWork, rows: slice = slice(None)) -> None:
+        n, cw = cropped.shape[0], cropped.shape[1]
+        if n == 0 or cw == 0:
+            vs.row_counts_numpy(cropped, work, rows)
+            return
+
+        cv2 = self.cv2
+        pixels32, brightness, mask, sums = self._buffers(n, cw)
+        np.copyto(pixels32, cropped)
+        cv2.transform(pixels32, self.weights, dst=brightness)
+
+        cv2.threshold(brightness, work.params.white_threshold, 1.0, cv2.THRESH_BINARY, dst=mask)
+        cv2.reduce(mask, 1, cv2.REDUCE_SUM, dst=sums, dtype=cv2.CV_32F)
+        np.copyto(work.white_counts[rows], sums[:, 0], casting="unsafe")
+
+        # brightness < BLACK  <=>  brightness <= BLACK - 0.5 for integer sums
+        cv2.threshold(brightness, work.params.black_threshold - 0.5, 1.0, cv2.THRESH_BINARY_INV, dst=mask)
+        cv2.reduce(mask, 1, cv2.REDUCE_SUM, dst=sums, dtype=cv2.CV_32F)
+        np.copyto(work.black_counts[rows], sums[:, 0], casting="unsafe")
+
+
+KERNELS: Dict[str, Type[RowCountKernel]] = {
+    NumpyKernel.name: NumpyKernel,
+    NumbaKernel.name: NumbaKernel,
+    OpenCVKernel.name: OpenCVKernel,
+}
+
+
+def available_kernels() -> List[str]:
+    return [name for name, cls in KERNELS.items() if cls.available()]
+
+
+def _test_frames(w: int, h: int) -> List[np.ndarray]:
+    rng = np.random.default_rng(1234)
+    frames = [render_frame(w, h, h // 3, h // 2), render_frame(w, h, None, None)]
+    frames += [rng.integers(0, 256, (h, w, 4), dtype=np.uint8) for _ in range(4)]
+
+    # brightness exactly on and around both thresholds
+    values = np.array([vs.WHITE_THRESHOLD - 1, vs.WHITE_THRESHOLD, vs.WHITE_THRESHOLD + 1,
+                       vs.BLACK_THRESHOLD - 1, vs.BLACK_THRESHOLD, vs.BLACK_THRESHOLD + 1, 0, 765])
+    idx = (np.arange(h)[:, None] + np.arange(w)[None, :]) % len(values)
+    total = values[idx]
+    edges = np.empty((h, w, 4), dtype=np.uint8)
+    edges[..., 0] = np.minimum(total, 255)
+    edges[..., 1] = np.clip(total - 255, 0, 255)
+    edges[..., 2] = np.clip(total - 510, 0, 255)
+    edges[..., 3] = 255
+    frames.append(edges)
+    return frames
+
+
+def verify_kernel(kernel: RowCountKernel, w: int = 95, h: int = 380) -> bool:
+    """
+    Bit-for-bit check against the NumPy reference, full frame and row windows.
+    """
+    ref = vs.DetectWork(w, h)
+    got = vs.DetectWork(w, h)
+    windows = [slice(None), slice(0, 1), slice(h // 3, h // 3 + 7), slice(max(0, h - 5), h)]
+    for px in _test_frames(w, h):
+        for rows in windows:
+            cropped = px[rows, ref.crop_left:ref.crop_right]
+            ref.white_counts[:] = 0
+            ref.black_counts[:] = 0
+            got.white_counts[:] = 1
+            got.black_counts[:] = 1
+            vs.row_counts_numpy(cropped, ref, rows)
+            kernel(cropped, got, rows)
+            if not (np.array_equal(ref.white_counts[rows], got.white_counts[rows])
+                    and np.array_equal(ref.black_counts[rows], got.black_counts[rows])):
+                return False
+    return True
+
+
+def benchmark_kernel(kernel: RowCountKernel, w: int, h: int, iters: int = 200) -> float:
+    """
+    Mean microseconds per full-frame call.
+    """
+    work = vs.DetectWork(w, h)
+    px = render_frame(w, h, h // 3, h // 2)
+    cropped = px[:, work.crop_left:work.crop_right]
+    kernel(cropped, work)  # JIT / scratch warm-up
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        kernel(cropped, work)
+    return (time.perf_counter() - t0) / iters * 1e6
+
+
+def select_kernel(name: str = "auto", w: int = 95, h: int = 380) -> RowCountKernel:
+    """
+    Returns the named kernel, or with "auto" the fastest installed one that
+    passes verification at this region size. Anything that fails to import,
+    compile or verify falls back to NumPy.
+    """
+    candidates = available_kernels() if name == "auto" else [name]
+    timings: Dict[str, float] = {}
+    best: Optional[RowCountKernel] = None
+
+    for cand in candidates:
+        cls = KERNELS.get(cand)
+        if cls is None or not cls.available():
+            LOG.warn("vision", f"kernel {cand} not installed")
+            continue
+        try:
+            kernel = cls()
+            if not verify_kernel(kernel, w, h):
+                LOG.warn("vision", f"kernel {cand} failed verification")
+                continue
+            timings[cand] = benchmark_kernel(kernel, w, h)
+        except Exception as e:
+            LOG.warn("vision", f"kernel {cand} unusable: {e}")
+            continue
+        if best is None or timings[cand] < timings[best.name]:
+            best = kernel
+
+    if best is None:
+        best = NumpyKernel()
+    LOG.info("vision", f"using {best.name} kernel", **{k: round(v, 1) for k, v in timings.items()})
+    return best
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Verify and time the detection kernels")
+    parser.add_argument("--w", type=int, default=95)
+    parser.add_argument("--h", type=int, default=380)
+    args = parser.parse_args()
+
+    for name in KERNELS:
+        cls = KERNELS[name]
+        if not cls.available():
+            print(f"{name:>7}: not installed")
+            continue
+        kernel = cls()
+        ok = verify_kernel(kernel, args.w, args.h)
+        us = benchmark_kernel(kernel, args.w, args.h)
+        print(f"{name:>7}: {'ok' if ok else 'MISMATCH'} {us:8.1f} us/frame")
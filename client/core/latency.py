@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .controller import Controller
+from .vision_simple import detect_zone_and_bar_bgra
+
+
+GrabFn = Callable[[], Tuple[bytes, int, int]]
+
+
+@dataclass
+class LatencyStats:
+    samples_ms: List[float] = field(default_factory=list)
+    failures: int = 0
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples_ms:
+            return None
+        ordered = sorted(self.samples_ms)
+        idx = min(len(ordered) - 1, int(round(q / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        n = len(self.samples_ms)
+        return {
+            "samples": n,
+            "failures": self.failures,
+            "mean_ms": sum(self.samples_ms) / n if n else None,
+            "min_ms": min(self.samples_ms) if n else None,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "max_ms": max(self.samples_ms) if n else None,
+        }
+
+
+def _bar_y(grab: GrabFn) -> Optional[int]:
+    raw, w, h = grab()
+    return detect_zone_and_bar_bgra(raw, w, h).bar_y
+
+
+def measure_latency(
+    controller: Controller,
+    grab: GrabFn,
+    pulses: int = 20,
+    min_move: int = 2,
+    timeout: float = 0.5,
+    settle: float = 0.25,
+) -> LatencyStats:
+    """
+    Sends scripted press pulses through the controller's input path and
+    watches bar_y in consecutive captures. Each sample is the time from
+    press() until a detection result shows the bar moving (the full
+    input -> game -> screen -> capture -> detect loop).
+    """
+    stats = LatencyStats()
+    controller.release()
+    time.sleep(settle)
+
+    for _ in range(pulses):
+        baseline = _bar_y(grab)
+        if baseline is None:
+            stats.failures += 1
+            time.sleep(settle)
+            continue
+
+        t0 = time.perf_counter()
+        controller.press()
+        try:
+            while True:
+                now = time.perf_counter()
+                if now - t0 > timeout:
+                    stats.failures += 1
+                    break
+                y = _bar_y(grab)
+                if y is not None and abs(y - baseline) >= min_move:
+                    stats.samples_ms.append((time.perf_counter() - t0) * 1000.0)
+                    break
+        finally:
+            controller.release()
+
+        # let the bar settle back before the next pulse
+        time.sleep(settle)
+
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure input-to-photon latency")
+    parser.add_argument("--sim", action="store_true", help="use the simulated screen")
+    parser.add_argument("--pulses", type=int, default=20)
+    parser.add_argument("--save", action="store_true", help="store the result in config.json")
+    args = parser.parse_args()
+
+    if args.sim:
+        from .sim import SimulatedScreen
+
+        screen = SimulatedScreen(delay=0.030)
+        ctrl = Controller(press=screen.press, release=screen.release)
+        grab = screen.grab
+        print(f"Simulated delay: {screen.delay * 1000:.1f} ms")
+    else:
+        from client.config.config_io import load_config
+        from .capture import grab_region
+
+        region = load_config()["capture"]["region"]
+        if not region:
+            raise SystemExit("No capture region set; calibrate first.")
+        ctrl = Controller()
+        grab = lambda: grab_region(region)
+
+    stats = measure_latency(ctrl, grab, pulses=args.pulses)
+    for k, v in stats.summary().items():
+        print(f"{k}: {v}")
+
+    if args.save:
+        from client.config.config_io import set_measured_latency
+
+        set_measured_latency(stats.percentile(50), stats.percentile(90))
+        print("Saved to config.")
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+
+LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+
+
+@dataclass
+class LogRecord:
+    ts: float
+    stage: str
+    level: str
+    message: str
+    counters: Dict[str, Any] = field(default_factory=dict)
+
+
+class LogRing:
+    """
+    Fixed-size ring of structured log records for the worker threads.
+    - write() does no I/O; producers (runner, watchdog, actuator threads)
+      share a short lock so the full check and `dropped` stay exact
+    - when full, the oldest record is overwritten and counted in `dropped`
+    - a single consumer (the log widget) drains it on its own timer
+    """
+
+    def __init__(self, capacity: int = 2048) -> None:
+        self.capacity = capacity
+        self.dropped = 0
+        self._buf: Deque[LogRecord] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def write(self, stage: str, level: str, message: str, **counters: Any) -> None:
+        rec = LogRecord(time.time(), stage, level, message, counters)
+        with self._lock:
+            if len(self._buf) == self.capacity:
+                self.dropped += 1
+            self._buf.append(rec)
+
+    def debug(self, stage: str, message: str, **counters: Any) -> None:
+        self.write(stage, "debug", message, **counters)
+
+    def info(self, stage: str, message: str, **counters: Any) -> None:
+        self.write(stage, "info", message, **counters)
+
+    def warn(self, stage: str, message: str, **counters: Any) -> None:
+        self.write(stage, "warn", message, **counters)
+
+    def error(self, stage: str, message: str, **counters: Any) -> None:
+        self.write(stage, "error", message, **counters)
+
+    def drain(self, max_items: Optional[int] = None) -> List[LogRecord]:
+        out: List[LogRecord] = []
+        buf = self._buf
+        while buf and (max_items is None or len(out) < max_items):
+            try:
+                out.append(buf.popleft())
+            except IndexError:
+                break
+        return out
+
+
+# Shared ring for the app; worker code logs here instead of print()
+LOG = LogRing()
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .capture import CaptureBackend, CaptureTrigger, PollTrigger, open_backend, open_trigger
+from .controller import Controller
+from .fidelity import fidelity_from_config
+from .frame_pool import FrameBuffer, FramePool
+from .history import history_from_config
+from .kernels import select_kernel
+from .log_ring import LOG
+from .realtime import GcPolicy, JitterStats, pin_current_thread
+from .scheduler import scheduler_from_config
+from .watchdog import FrameWatchdog
+from .vision_simple import (
+    DetectWork,
+    PyramidWork,
+    detect_zone_and_bar_pixels,
+    detect_zone_and_bar_pyramid,
+    params_from_config,
+    DetectionResult,
+)
+
+
+def controller_from_config(cfg: Dict[str, Any]) -> Controller:
+    control = cfg.get("control", {})
+    pwm_period = None
+    if control.get("pwm_enabled"):
+        pwm_period = control.get("pwm_period_ms", 20) / 1000.0
+    controller = Controller(pwm_period=pwm_period)
+    controller.max_age = control.get("max_frame_age_ms", 100) / 1000.0 or None
+    if controller.actuator is not None:
+        controller.actuator.cores = cfg.get("realtime", {}).get("control_cores") or None
+    return controller
+
+
+class ControlLoop:
+    """
+    Headless capture -> detect -> control pipeline (no Qt).
+    Runner wraps it in a QThread for the GUI; benchmarks and worker
+    processes drive it directly.
+    """
+
+    def __init__(
+        self,
+        region: Dict[str, int],
+        cfg: Optional[Dict[str, Any]] = None,
+        controller: Optional[Controller] = None,
+        backend: Optional[CaptureBackend] = None,
+    ) -> None:
+        self.region = region
+        self.cfg = cfg or {}
+        self.controller = controller or controller_from_config(self.cfg)
+        self.scheduler = scheduler_from_config(self.cfg)
+        self.scheduler.threshold = self.controller.threshold
+        self.backend = backend
+        self.trigger: Optional[CaptureTrigger] = None
+        self.errors = 0
+        self.idle_captures = 0   # captures forced by idle_capture_ms (trigger mode)
+        self.idle_wakeups = 0    # trigger timeouts that did not capture
+        self.missed_damage = 0   # forced idle captures that found a changed frame
+
+        # time spent inside tick() (capture + detect + control), seconds
+        self.busy_total = 0.0
+        self.busy_max = 0.0
+        self.busy_ticks = 0
+        # time spent in detect() on the last tick, seconds (drives fidelity)
+        self.detect_time = 0.0
+        self.history = history_from_config(self.cfg)
+
+        # newest result; fed to the controller again on ticks without a new one
+        self.last_result: Optional[DetectionResult] = None
+        # last_result has been rejected as stale once; hold_last() stops resending it
+        self._aged_out = False
+        # serialises controller calls from this loop and the watchdog thread
+        self._control_lock = threading.Lock()
+
+        # releases input from its own thread if capture stalls (control.watchdog_ms)
+        watchdog_ms = self.cfg.get("control", {}).get("watchdog_ms", 250)
+        self.watchdog: Optional[FrameWatchdog] = None
+        if watchdog_ms:
+            self.watchdog = FrameWatchdog(watchdog_ms / 1000.0, self._release)
+
+        realtime = self.cfg.get("realtime", {})
+        self.capture_cores = realtime.get("capture_cores") or None
+        self.gc_policy = GcPolicy(realtime.get("gc_mode", "default"))
+        self.jitter = JitterStats()
+
+        # Recycled frame memory: pooled buffers go out to the consumer, the spare
+        # is used (and never published) when the consumer still holds all of them.
+        w, h = region["w"], region["h"]
+        pool_size = self.cfg.get("capture", {}).get("pool_size", 4)
+        self.pool = FramePool(w, h, size=pool_size)
+        self._spare = FrameBuffer(w, h)
+        self._dropping = False
+
+        vision = self.cfg.get("vision", {})
+        params = params_from_config(vision)
+        self._work = DetectWork(w, h, params)
+        factor = vision.get("pyramid_factor", 1)
+        self._tolerance_px = vision.get("pyramid_tolerance_px", 0)
+        self._pyramid = factor > 1 and h >= vision.get("pyramid_min_height", 800)
+        if self._pyramid:
+            self._work = PyramidWork(w, h, factor, params)
+
+        # optional load-adaptive degradation (vision.adaptive_fidelity)
+        self.fidelity = fidelity_from_config(self.cfg, w, h, params)
+
+    def open(self) -> None:
+        """
+        Opens the capture backend and picks the detection kernel.
+        Call from the thread that will run the loop.
+        """
+        if self.backend is None:
+            self.backend = open_backend(self.region, self.cfg)
+        LOG.info("capture", f"using {self.backend.name} backend")
+        self.trigger = open_trigger(self.region, self.cfg, self.backend)
+        if not isinstance(self.trigger, PollTrigger):
+            LOG.info("capture", f"capturing on {self.trigger.name}")
+
+        # kernel choice benchmarks (and may JIT), so it happens off the GUI thread
+        kernel_name = self.cfg.get("vision", {}).get("kernel", "auto")
+        self._work.row_counts = select_kernel(kernel_name, self._work.w, self._work.h)
+        if self.fidelity is not None:
+            self.fidelity.set_kernel(self._work.row_counts)
+
+    def close(self) -> None:
+        if self.trigger is not None:
+            self.trigger.close()
+            self.trigger = None
+        if self.backend is not None:
+            self.backend.close()
+
+    def detect(self, buf: FrameBuffer) -> DetectionResult:
+        if self.fidelity is not None and self.fidelity.level:
+            return self.fidelity.detect(buf.pixels)
+        if self._pyramid:
+            return detect_zone_and_bar_pyramid(buf.pixels, self._work, self._tolerance_px)
+        return detect_zone_and_bar_pixels(buf.pixels, self._work)
+
+    def tick(self) -> Tuple[Optional[FrameBuffer], DetectionResult]:
+        """
+        One capture/detect/control step. Returns (buf, result); buf is None when
+        the pool was exhausted, otherwise the caller owns it and must release() it.
+        Capture/detection errors propagate after the pooled buffer is returned.
+        """
+        buf = self.pool.acquire()
+        publish = buf is not None
+        if buf is None:
+            buf = self._spare
+            # logged once per run of dropped frames; pool.exhausted counts every one
+            if not self._dropping:
+                self._dropping = True
+                LOG.warn("capture", "frame pool exhausted, preview frames dropped", exhausted=self.pool.exhausted)
+        else:
+            self._dropping = False
+
+        try:
+            # stamped before the grab, so ages err on the old side
+            captured_at = time.perf_counter()
+            self.backend.grab_into(buf)
+            buf.captured_at = captured_at
+            if self.watchdog is not None:
+                self.watchdog.feed(captured_at)
+            detect_start = time.perf_counter()
+            result = self.detect(buf)
+            self.detect_time = time.perf_counter() - detect_start
+            result.captured_at = captured_at
+
+            # Controller doesn't touch Qt and (in PWM mode) never sleeps,
+            # so it is driven straight from this thread
+            self.last_result = result
+            self._aged_out = False
+            with self._control_lock:
+                self.controller.update(result)
+            self.history.append(result, self.controller.hold_level())
+        except Exception:
+            if publish:
+                buf.release()
+            raise
+
+        return (buf if publish else None), result
+
+    def hold_last(self) -> None:
+        """
+        Control step for a tick that produced no new frame (capture error, idle
+        wakeup): the last result goes to the controller again, and once it is
+        older than control.max_frame_age_ms the controller treats it as lost and
+        releases. After that release the result is not resent, so `stale`
+        counts each aged-out frame once.
+        """
+        if self._aged_out:
+            return
+        with self._control_lock:
+            stale = self.controller.stale
+            self.controller.update(self.last_result)
+            self._aged_out = self.controller.stale != stale
+
+    def _release(self) -> None:
+        # watchdog thread: wait for a running update() instead of racing it
+        with self._control_lock:
+            self.controller.reset()
+
+    def run(
+        self,
+        keep_running: Callable[[], bool],
+        on_frame: Optional[Callable[[FrameBuffer, DetectionResult], None]] = None,
+    ) -> None:
+        """
+        Ticks until keep_running() is False, sleeping as the scheduler says.
+        on_frame takes ownership of published buffers; without it they are released.
+        """
+        pin_current_thread(self.capture_cores, "capture")
+        self.gc_policy.enter()
+        if self.watchdog is not None:
+            self.watchdog.start()
+        try:
+            self._run(keep_running, on_frame)
+        finally:
+            if self.watchdog is not None:
+                self.watchdog.stop()
+            self.gc_policy.exit()
+
+    def _run(
+        self,
+        keep_running: Callable[[], bool],
+        on_frame: Optional[Callable[[FrameBuffer, DetectionResult], None]],
+    ) -> None:
+        trigger = self.trigger
+        if isinstance(trigger, PollTrigger):
+            trigger = None
+        # without damage, capture anyway this often so a trigger that stopped
+        # reporting (e.g. under a compositing WM) is noticed
+        idle_capture = self.cfg.get("capture", {}).get("idle_capture_ms", 500) / 1000.0
+        # in between the loop only wakes to check keep_running() and let the last
+        # result age out; no grab, and the watchdog is fed by real grabs only
+        wake = 0.1
+        if self.watchdog is not None:
+            wake = min(wake, self.watchdog.timeout / 2.0)
+            if trigger is not None:
+                self.watchdog.idle_allowance = idle_capture
+        last_capture = time.perf_counter()
+
+        while keep_running():
+            forced = False
+            if trigger is not None:
+                # sleep until the region changes; the scheduler delay below still caps the rate
+                wait_start = time.perf_counter()
+                if self.watchdog is not None:
+                    self.watchdog.idle = True
+                damaged = trigger.wait(wake)
+                now = time.perf_counter()
+                if not damaged:
+                    if now - last_capture < idle_capture:
+                        self.idle_wakeups += 1
+                        self.hold_last()
+                        continue
+                    self.idle_captures += 1
+                    forced = True
+                if self.watchdog is not None:
+                    self.watchdog.idle = False
+                if now - wait_start > 0.001:
+                    # blocked waiting for damage: an idle gap, not a late tick
+                    self.jitter.reset_expectation()
+
+            tick_start = time.perf_counter()
+            last_capture = tick_start
+            prev = self.last_result
+            try:
+                buf, result = self.tick()
+                busy = time.perf_counter() - tick_start
+                self.busy_total += busy
+                self.busy_ticks += 1
+                if busy > self.busy_max:
+                    self.busy_max = busy
+                if self.fidelity is not None:
+                    self.fidelity.observe(self.detect_time)
+            except Exception as e:
+                self.errors += 1
+                LOG.error("runner", str(e), errors=self.errors)
+                self.hold_last()
+                # decide whether to stop or continue; here we continue after a short pause
+                time.sleep(0.05)
+                self.jitter.reset_expectation()
+                continue
+
+            if forced and prev is not None and (
+                (prev.active, prev.white_y, prev.bar_y) != (result.active, result.white_y, result.bar_y)
+            ):
+                # the region changed but the trigger never said so
+                self.missed_damage += 1
+                if self.missed_damage == 1:
+                    LOG.warn("capture", f"{trigger.name} trigger missed a change, found by an idle capture",
+                             idle_captures=self.idle_captures)
+
+            if buf is not None:
+                if on_frame is not None:
+                    on_frame(buf, result)
+                else:
+                    buf.release()
+
+            # next capture time comes from the scheduler (fixed loop_hz or adaptive)
+            interval = self.scheduler.next_interval(result, tick_start)
+            self.jitter.tick(tick_start, interval)
+            self.gc_policy.after_tick(result)
+            delay = interval - (time.perf_counter() - tick_start)
+            if delay > 0:
+                time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Throughput / latency counters as plain values (sent between processes by the supervisor).
+        """
+        sched = self.scheduler.report()
+        stats = {
+            "ticks": sched["ticks"],
+            "fps": round(sched["fps"], 2),
+            "busy_mean_ms": round(self.busy_total / self.busy_ticks * 1000.0, 3) if self.busy_ticks else 0.0,
+            "busy_max_ms": round(self.busy_max * 1000.0, 3),
+            "errors": self.errors,
+            "stale": self.controller.stale,
+            "pool_exhausted": self.pool.exhausted,
+        }
+        if self.trigger is not None and not isinstance(self.trigger, PollTrigger):
+            stats["idle_captures"] = self.idle_captures
+            stats["idle_wakeups"] = self.idle_wakeups
+            stats["missed_damage"] = self.missed_damage
+        stats.update({f"jitter_{k}": v for k, v in self.jitter.summary().items() if k != "ticks"})
+        if self.watchdog is not None:
+            stats.update(self.watchdog.summary())
+        if self.fidelity is not None:
+            stats["fidelity_level"] = self.fidelity.level
+            stats["fidelity_steps"] = self.fidelity.steps
+        return stats
+
+    def report(self) -> None:
+        if self.controller.actuator is not None:
+            LOG.info("control", "actuator stopped", **self.controller.actuator.stats.summary())
+        LOG.info("scheduler", "tick stats", **{k: round(v, 2) for k, v in self.scheduler.report().items()})
+        LOG.info("realtime", "tick jitter", gc_collections=self.gc_policy.collections, **self.jitter.summary())
+        stats = self.watchdog.summary() if self.watchdog is not None else {}
+        LOG.info("watchdog", "frame age", stale=self.controller.stale, **stats)
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import gc
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .log_ring import LOG
+from .vision_simple import DetectionResult
+
+
+def pin_current_thread(cores: Optional[List[int]], stage: str) -> bool:
+    """
+    Restricts the calling thread to `cores` (Linux: sched_setaffinity on tid 0).
+    Empty/None leaves the affinity alone.
+    """
+    if not cores:
+        return False
+    if not hasattr(os, "sched_setaffinity"):
+        LOG.warn(stage, "CPU affinity not supported on this platform")
+        return False
+    try:
+        os.sched_setaffinity(0, set(cores))
+    except (OSError, ValueError) as e:
+        LOG.warn(stage, f"cannot pin to cores {cores}: {e}")
+        return False
+    LOG.info(stage, f"pinned to cores {sorted(cores)}")
+    return True
+
+
+class GcPolicy:
+    """
+    Keeps garbage-collection pauses out of the tick loop.
+    - "default": leave gc alone
+    - "freeze":  collect once, then gc.freeze() so startup objects are never rescanned
+    - "disable": freeze and disable automatic collection; collect between rounds
+                 (detection going inactive) or every `max_gap` seconds at the latest
+    gc settings are process wide, so the GUI thread is affected too.
+    """
+
+    def __init__(self, mode: str = "default", max_gap: float = 30.0) -> None:
+        self.mode = mode
+        self.max_gap = max_gap
+        self.collections = 0
+        self._was_enabled = gc.isenabled()
+        self._was_active = False
+        self._last_collect = time.monotonic()
+
+    def enter(self) -> None:
+        if self.mode == "default":
+            return
+        self._was_enabled = gc.isenabled()
+        gc.collect()
+        gc.freeze()
+        if self.mode == "disable":
+            gc.disable()
+        self._last_collect = time.monotonic()
+
+    def exit(self) -> None:
+        if self.mode == "default":
+            return
+        gc.unfreeze()
+        if self._was_enabled:
+            gc.enable()
+
+    def after_tick(self, result: Optional[DetectionResult]) -> None:
+        if self.mode != "disable":
+            return
+        active = bool(result and result.active)
+        now = time.monotonic()
+        round_ended = self._was_active and not active
+        self._was_active = active
+        if round_ended or now - self._last_collect > self.max_gap:
+            gc.collect()
+            self.collections += 1
+            self._last_collect = time.monotonic()
+
+
+class JitterStats:
+    """
+    How late each tick started relative to when the scheduler asked for it.
+    Keeps the newest `keep` samples in a ring, so on long runs the summary
+    describes recent ticks; `ticks` counts every sample.
+    """
+
+    def __init__(self, keep: int = 10000) -> None:
+        self.keep = keep
+        self.samples: Deque[float] = deque(maxlen=keep)
+        self.count = 0
+        self._expected: Optional[float] = None
+
+    def tick(self, start: float, interval: float) -> None:
+        if self._expected is not None:
+            self.samples.append(start - self._expected)
+            self.count += 1
+        self._expected = start + interval
+
+    def reset_expectation(self) -> None:
+        # after an error pause the next tick isn't "late"
+        self._expected = None
+
+    def summary(self) -> Dict[str, Any]:
+        n = len(self.samples)
+        if not n:
+            return {"ticks": 0}
+        ordered = sorted(self.samples)
+        mean = sum(ordered) / n
+        std = math.sqrt(sum((s - mean) ** 2 for s in ordered) / n)
+        return {
+            "ticks": self.count,
+            "mean_ms": round(mean * 1000.0, 3),
+            "std_ms": round(std * 1000.0, 3),
+            "p99_ms": round(ordered[min(n - 1, int(n * 0.99))] * 1000.0, 3),
+            "max_ms": round(ordered[-1] * 1000.0, 3),
+        }
+
+
+class ThreadCpuMeter:
+    """
+    CPU share of the thread that calls sample() (time.thread_time), split
+    by mode, e.g. the GUI thread "idle" vs "running". Each sample() charges
+    the time since the previous one to the mode passed in.
+    """
+
+    def __init__(self) -> None:
+        self.cpu: Dict[str, float] = {}
+        self.wall: Dict[str, float] = {}
+        self._cpu0 = time.thread_time()
+        self._wall0 = time.perf_counter()
+
+    def sample(self, mode: str) -> None:
+        cpu, wall = time.thread_time(), time.perf_counter()
+        self.cpu[mode] = self.cpu.get(mode, 0.0) + cpu - self._cpu0
+        self.wall[mode] = self.wall.get(mode, 0.0) + wall - self._wall0
+        self._cpu0, self._wall0 = cpu, wall
+
+    def percent(self, mode: str) -> Optional[float]:
+        wall = self.wall.get(mode, 0.0)
+        if wall <= 0.0:
+            return None
+        return self.cpu[mode] / wall * 100.0
+
+
+if __name__ == "__main__":
+    # Tick jitter of the headless loop on synthetic frames under each setting
+    import argparse
+    import threading
+    from copy import deepcopy
+
+    from client.config.config_io import DEFAULT_CONFIG
+    from .capture import SyntheticBackend
+    from .controller import Controller
+    from .loop import ControlLoop
+
+    parser = argparse.ArgumentParser(description="Tick jitter per real-time setting")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--hz", type=int, default=120)
+    parser.add_argument("--cores", type=int, nargs="*", default=[0])
+    args = parser.parse_args()
+
+    region = {"x": 0, "y": 0, "w": 95, "h": 380}
+    settings = [
+        ("default", {}),
+        ("gc freeze", {"gc_mode": "freeze"}),
+        ("gc disable", {"gc_mode": "disable"}),
+        (f"cores {args.cores}", {"capture_cores": args.cores}),
+        ("all", {"gc_mode": "disable", "capture_cores": args.cores}),
+    ]
+
+    print(f"{'setting':>14} {'ticks':>6} {'mean_ms':>8} {'std_ms':>7} {'p99_ms':>7} {'max_ms':>7}")
+    for label, overrides in settings:
+        cfg = deepcopy(DEFAULT_CONFIG)
+        cfg["control"]["loop_hz"] = args.hz
+        cfg["realtime"].update(overrides)
+        noop = lambda: None
+        loop = ControlLoop(region, cfg, controller=Controller(press=noop, release=noop),
+                           backend=SyntheticBackend(region, cfg))
+
+        # garbage producer standing in for the GUI thread
+        stop = threading.Event()
+
+        def churn() -> None:
+            while not stop.is_set():
+                junk = [{"i": i, "l": [i] * 4} for i in range(500)]
+                junk.append(junk)
+                time.sleep(0.005)
+
+        t_churn = threading.Thread(target=churn, daemon=True)
+        t_churn.start()
+        t_end = time.perf_counter() + args.seconds
+        worker = threading.Thread(target=loop.run, args=(lambda: time.perf_counter() < t_end,))
+        worker.start()
+        worker.join()
+        stop.set()
+        t_churn.join()
+
+        s = loop.jitter.summary()
+        print(f"{label:>14} {s['ticks']:>6} {s.get('mean_ms', 0):>8} {s.get('std_ms', 0):>7} "
+              f"{s.get('p99_ms', 0):>7} {s.get('max_ms', 0):>7}")
+        LOG.drain()
@@ -48,55 +48,93 @@ class Runner(QThread):
 from __future__ import annotations
 
 import time
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from PySide6.QtCore import QThread, Signal
 
-from .capture import grab_region
-from .vision_simple import detect_zone_and_bar_bgra, DetectionResult
-from .controller import Controller
+from .frame_pool import FrameBuffer
+from .log_ring import LOG
+from .loop import ControlLoop
+from .vision_simple import DetectionResult
+
+
+PRIORITIES = {
+    "inherit": QThread.InheritPriority,
+    "normal": QThread.NormalPriority,
+    "high": QThread.HighPriority,
+    "highest": QThread.HighestPriority,
+    "time_critical": QThread.TimeCriticalPriority,
+}
 
 
 class Runner(QThread):
     # use object to avoid typing issues
+    # (FrameBuffer, w, h, DetectionResult); the receiver must release() the buffer
     frame_ready = Signal(object, int, int, object)
 
-    def __init__(self, region: Dict[str, int], parent: Any = None) -> None:
+    def __init__(self, region: Dict[str, int], cfg: Optional[Dict[str, Any]] = None, parent: Any = None) -> None:
         super().__init__(parent)
         self.region = region
-        self.controller = Controller()  
+        self.cfg = cfg or {}
+
+        self.loop = ControlLoop(region, self.cfg)
+        self.controller = self.loop.controller
         self.running = False
 
-    def start(self, priority=QThread.InheritPriority) -> None:
+        # GUI side reads these instead of getting a signal per frame:
+        # last_result is polled by the status timer, and frames are only
+        # published every publish_interval seconds (0 = every frame, None = never)
+        self.publish_interval: Optional[float] = 0.0
+        self._last_publish = 0.0
+
+    def start(self, priority=None) -> None:
+        if priority is None:
+            name = self.cfg.get("realtime", {}).get("priority", "inherit")
+            priority = PRIORITIES.get(name, QThread.InheritPriority)
         self.running = True
         super().start(priority)
 
     def stop(self) -> None:
         self.running = False
-        # Make sure reset is safe to call from the thread that calls stop (main thread)
+        # run() releases the input itself once the loop has exited; resetting
+        # from here could race a tick still inside controller.update()
+        if not self.wait(2000):
+            LOG.error("control", "runner did not stop in time, releasing input from the GUI thread")
+            self._reset_controller()
+        self.loop.report()
+
+    def _reset_controller(self) -> None:
         try:
             self.controller.reset()
         except Exception as e:
-            print("Controller reset error:", e)
-        self.wait(2000)  # optional timeout
+            LOG.error("control", f"Controller reset error: {e}")
+
+    @property
+    def last_result(self) -> Optional[DetectionResult]:
+        # set by every tick, including those whose frame was dropped (pool exhausted)
+        return self.loop.last_result
+
+    def _publish(self, buf: FrameBuffer, result: DetectionResult) -> None:
+        interval = self.publish_interval
+        now = time.perf_counter()
+        if interval is None or now - self._last_publish < interval:
+            # preview throttled: the frame goes straight back to the pool
+            buf.release()
+            return
+        self._last_publish = now
+        self.frame_ready.emit(buf, buf.w, buf.h, result)
 
     def run(self) -> None:
-        while self.running:
-            try:
-                raw, w, h = grab_region(self.region)
-                result: DetectionResult = detect_zone_and_bar_bgra(raw, w, h)
-
-                # DON'T call controller.update() from this thread if controller touches Qt
-                # Option 1: shows result and lets a main-thread slot call controller.update
-                self.frame_ready.emit(raw, w, h, result)
-
-                # self.controller.update(result). also option 2: if controller is thread-safe
-
-            except Exception as e:
-                print("Runner error:", e)
-                # decide whether to stop or continue; here we continue after a short pause
-                time.sleep(0.05)
-                continue
+        # opened on this thread: X connections / mss handles are per thread
+        try:
+            self.loop.open()
+        except Exception as e:
+            LOG.error("capture", f"cannot open capture backend: {e}")
+            return
 
-            # sleep a small amount to limit cpu usage 
-            QThread.msleep(10)
+        try:
+            self.loop.run(lambda: self.running, self._publish)
+        finally:
+            # last thing on this thread: no tick can press again after this
+            self._reset_controller()
+            self.loop.close()
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import math
+from typing import Dict, Optional
+
+from .vision_simple import DetectionResult
+
+
+class TickScheduler:
+    """
+    Picks the delay until the next capture from the current distance and its
+    rate of change:
+    - predicts when d will next cross one of the controller's thresholds (±threshold)
+    - samples at least twice before that crossing (minus the measured input latency)
+    - relaxes towards min_hz when the bar is stable
+    - polls at idle_hz while nothing is detected, and jumps to max_hz on the
+      first frame where the minigame shows up
+    With adaptive=False it simply runs at fixed_hz.
+    """
+
+    def __init__(
+        self,
+        min_hz: float = 30.0,
+        max_hz: float = 240.0,
+        threshold: float = 2.0,
+        latency: float = 0.0,
+        adaptive: bool = True,
+        fixed_hz: float = 90.0,
+        smoothing: float = 0.5,
+        idle_hz: float = 90.0,
+    ) -> None:
+        self.min_interval = 1.0 / max_hz
+        self.max_interval = 1.0 / min_hz
+        self.fixed_interval = 1.0 / fixed_hz
+        self.idle_interval = 1.0 / idle_hz
+        self.threshold = threshold
+        self.latency = latency
+        self.adaptive = adaptive
+        self.smoothing = smoothing   # EMA weight of the newest speed sample
+
+        self.interval = self.fixed_interval if not adaptive else self.idle_interval
+        self._last_d: Optional[float] = None
+        self._last_t: Optional[float] = None
+        self.speed = 0.0   # px/s, d/dt
+
+        # trade-off report
+        self.ticks = 0
+        self.active_ticks = 0
+        self.abs_error = 0.0
+        self.sq_error = 0.0
+        self._first_t: Optional[float] = None
+        self._now = 0.0
+
+    def time_to_crossing(self, d: float) -> float:
+        """
+        Seconds until d reaches the next controller threshold at the current speed.
+        """
+        v, thr = self.speed, self.threshold
+        if v > 0:
+            target = -thr if d < -thr else thr
+            return (target - d) / v if target > d else math.inf
+        if v < 0:
+            target = thr if d > thr else -thr
+            return (d - target) / -v if d > target else math.inf
+        return math.inf
+
+    def next_interval(self, result: Optional[DetectionResult], now: float) -> float:
+        if self._first_t is None:
+            self._first_t = now
+        self._now = now
+        self.ticks += 1
+
+        if not result or not result.active or result.distance is None:
+            self._last_d = None
+            self.interval = self.fixed_interval if not self.adaptive else self.idle_interval
+            return self.interval
+
+        d = result.distance
+        self.active_ticks += 1
+        self.abs_error += abs(d)
+        self.sq_error += d * d
+
+        first = self._last_d is None
+        if first:
+            # no speed for a fresh detection yet; the old one belongs to the last round
+            self.speed = 0.0
+        elif now > self._last_t:
+            v = (d - self._last_d) / (now - self._last_t)
+            self.speed += self.smoothing * (v - self.speed)
+        self._last_d = d
+        self._last_t = now
+
+        if not self.adaptive:
+            self.interval = self.fixed_interval
+            return self.interval
+        if first:
+            # minigame just appeared: sample at full rate, then relax from there
+            self.interval = self.min_interval
+            return self.interval
+
+        t_cross = self.time_to_crossing(d) - self.latency
+        # two samples before the crossing; grow at most 25% per tick when relaxing
+        target = max(0.0, t_cross) / 2.0
+        target = min(target, self.interval * 1.25)
+        self.interval = min(self.max_interval, max(self.min_interval, target))
+        return self.interval
+
+    def report(self) -> Dict[str, float]:
+        elapsed = (self._now - self._first_t) if self._first_t is not None else 0.0
+        n = self.active_ticks
+        return {
+            "ticks": self.ticks,
+            "fps": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "mean_abs_error_px": self.abs_error / n if n else 0.0,
+            "rms_error_px": math.sqrt(self.sq_error / n) if n else 0.0,
+        }
+
+
+def scheduler_from_config(cfg: Dict) -> TickScheduler:
+    control = cfg.get("control", {})
+    latency_ms = control.get("latency_ms") or 0.0
+    return TickScheduler(
+        min_hz=control.get("min_hz", 30),
+        max_hz=control.get("max_hz", 240),
+        latency=latency_ms / 1000.0,
+        adaptive=control.get("adaptive_tick", False),
+        fixed_hz=control.get("loop_hz", 90),
+        idle_hz=control.get("idle_hz", 90),
+    )
+
+
+if __name__ == "__main__":
+    # fps vs tracking error on the simulated screen, fixed rates next to adaptive
+    import argparse
+    import time
+
+    from .controller import Controller
+    from .sim import SimulatedScreen
+    from .vision_simple import detect_zone_and_bar_bgra
+
+    parser = argparse.ArgumentParser(description="Fixed vs adaptive tick rate on the simulator")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    def run(sched: TickScheduler) -> Dict[str, float]:
+        screen = SimulatedScreen(delay=args.latency_ms / 1000.0)
+        ctrl = Controller(press=screen.press, release=screen.release)
+        ctrl.threshold = sched.threshold
+        t_end = time.perf_counter() + args.seconds
+        while True:
+            t0 = time.perf_counter()
+            if t0 >= t_end:
+                break
+            raw, w, h = screen.grab()
+            result = detect_zone_and_bar_bgra(raw, w, h)
+            ctrl.update(result)
+            delay = sched.next_interval(result, t0) - (time.perf_counter() - t0)
+            if delay > 0:
+                time.sleep(delay)
+        ctrl.release()
+        return sched.report()
+
+    print(f"{'mode':>14} {'fps':>7} {'mean_err':>9} {'rms_err':>8}")
+    modes = [(f"fixed {hz} Hz", TickScheduler(adaptive=False, fixed_hz=hz)) for hz in (30, 60, 120, 240)]
+    modes.append(("adaptive", TickScheduler(min_hz=30, max_hz=240, latency=args.latency_ms / 1000.0)))
+    for label, sched in modes:
+        r = run(sched)
+        print(f"{label:>14} {r['fps']:>7.1f} {r['mean_abs_error_px']:>9.2f} {r['rms_error_px']:>8.2f}")
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+# Pixel values chosen to sit clearly on either side of the detector thresholds
+BACKGROUND = 128   # brightness 384: neither white nor black
+WHITE = 255        # brightness 765
+BLACK = 0          # brightness 0
+
+
+def render_frame(
+    w: int,
+    h: int,
+    white_y: Optional[int],
+    bar_y: Optional[int],
+    bar_h: int = 3,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Draws a synthetic BGRA frame: grey background, 1px white line, black bar.
+    Returns an (h, w, 4) uint8 array (written into `out` if given).
+    """
+    if out is None:
+        out = np.empty((h, w, 4), dtype=np.uint8)
+    out[..., :3] = BACKGROUND
+    out[..., 3] = 255
+
+    if white_y is not None and 0 <= white_y < h:
+        out[white_y, :, :3] = WHITE
+    if bar_y is not None:
+        top = max(0, int(bar_y))
+        bottom = min(h, int(bar_y) + bar_h)
+        out[top:bottom, :, :3] = BLACK
+    return out
+
+
+class SimulatedScreen:
+    """
+    Stand-in for the game + screen: a bar driven by the mouse button with a
+    fixed input-to-photon delay. Holding moves the bar towards larger y
+    (shrinking d = white_y - bar_y, as Controller assumes); releasing moves it back.
+    press()/release() match the Controller input path, grab() matches grab_region.
+    """
+
+    def __init__(
+        self,
+        w: int = 95,
+        h: int = 380,
+        white_y: int = 150,
+        delay: float = 0.030,
+        hold_speed: float = 600.0,     # px/s while held
+        release_speed: float = 400.0,  # px/s while released
+    ) -> None:
+        self.w = w
+        self.h = h
+        self.white_y = white_y
+        self.delay = delay
+        self.hold_speed = hold_speed
+        self.release_speed = release_speed
+
+        self.bar_y = 0.0
+        self.presses = 0
+
+        self._lock = threading.Lock()
+        self._pressed = False
+        self._pending: List[Tuple[float, bool]] = []   # (visible_at, pressed)
+        self._last = time.perf_counter()
+        self._frame = np.empty((h, w, 4), dtype=np.uint8)
+
+    def press(self) -> None:
+        with self._lock:
+            self.presses += 1
+            self._pending.append((time.perf_counter() + self.delay, True))
+
+    def release(self) -> None:
+        with self._lock:
+            self._pending.append((time.perf_counter() + self.delay, False))
+
+    def _advance(self, until: float) -> None:
+        # integrate bar motion, applying delayed input changes as they become visible
+        while True:
+            t_next = until
+            if self._pending and self._pending[0][0] < until:
+                t_next = self._pending[0][0]
+            dt = max(0.0, t_next - self._last)
+            if self._pressed:
+                self.bar_y += self.hold_speed * dt
+            else:
+                self.bar_y -= self.release_speed * dt
+            self.bar_y = min(max(self.bar_y, 0.0), float(self.h - 4))
+            self._last = t_next
+            if t_next >= until:
+                return
+            self._pressed = self._pending.pop(0)[1]
+
+    def grab(self) -> Tuple[bytes, int, int]:
+        self.grab_into(self._frame)
+        return self._frame.tobytes(), self.w, self.h
+
+    def grab_into(self, pixels: np.ndarray) -> np.ndarray:
+        with self._lock:
+            self._advance(time.perf_counter())
+            render_frame(self.w, self.h, self.white_y, int(round(self.bar_y)), out=pixels)
+        return pixels
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+from typing import Any, Dict, List, Optional
+
+from client.config.config_io import deep_merge
+
+from .log_ring import LOG
+
+
+def _noop() -> None:
+    pass
+
+
+def _worker_main(name: str, cfg: Dict[str, Any], stats_q: Any, stop: Any) -> None:
+    """
+    Worker process: one headless ControlLoop on one region. Imports happen
+    here so each process builds its own capture connections and JIT caches.
+    Messages are (name, pid, stats) so the supervisor can tell a restarted
+    worker from the process it replaced.
+    """
+    # Ctrl+C goes to the whole process group; the supervisor decides when we stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from .controller import Controller
+    from .loop import ControlLoop, controller_from_config
+    from .realtime import pin_current_thread
+
+    inst = cfg["instance"]
+    cores = inst.get("cores") or None
+    # pin the process first: threads started later (actuator, watchdog) inherit it
+    pin_current_thread(cores, name)
+
+    controller = Controller(press=_noop, release=_noop) if inst.get("dry_run") else controller_from_config(cfg)
+    loop = ControlLoop(inst["region"], cfg, controller=controller)
+    interval = cfg["supervisor"]["stats_interval_s"]
+    pid = os.getpid()
+    next_report = time.perf_counter() + interval
+
+    def keep_running() -> bool:
+        nonlocal next_report
+        now = time.perf_counter()
+        if now >= next_report:
+            next_report = now + interval
+            stats_q.put((name, pid, loop.stats()))
+            # worker logs only reach the supervisor as counters
+            for rec in LOG.drain():
+                if rec.level == "error":
+                    stats_q.put((name, pid, {"error": f"{rec.stage}: {rec.message}"}))
+        return not stop.is_set()
+
+    loop.open()
+    try:
+        loop.run(keep_running)
+    finally:
+        controller.reset()
+        loop.close()
+        stats_q.put((name, pid, loop.stats()))
+
+
+class Worker:
+    """
+    Supervisor-side handle for one instance: process, restart count, last stats.
+    """
+
+    def __init__(self, name: str, cfg: Dict[str, Any]) -> None:
+        self.name = name
+        self.cfg = cfg
+        self.process: Optional[mp.process.BaseProcess] = None
+        self.restarts = 0
+        self.failed = False     # gave up after restart_limit
+        self.next_start = 0.0   # restart backoff
+        self.stats: Dict[str, Any] = {}
+        self.total_ticks = 0    # ticks from processes that already exited
+
+
+class Supervisor:
+    """
+    Runs one worker process per configured instance (supervisor.instances).
+    - Each worker is pinned to its own cores, so capture, NumPy and input
+      don't share a GIL with the other instances
+    - Crashed workers are restarted with a growing delay, up to restart_limit
+    - Workers report ControlLoop.stats() every stats_interval_s; summary()
+      merges them
+    Every real (non dry_run) worker drives the same OS mouse, so at most one
+    instance may be real; the others have to be dry_run.
+    """
+
+    def __init__(self, cfg: Dict[str, Any]) -> None:
+        self.cfg = cfg
+        self.ctx = mp.get_context("spawn")
+        self.stats_q = self.ctx.Queue()
+        self.stop_event = self.ctx.Event()
+        self.restart_limit = cfg.get("supervisor", {}).get("restart_limit", 5)
+        self.workers: List[Worker] = []
+
+        instances = cfg.get("supervisor", {}).get("instances") or []
+        if not instances:
+            region = cfg.get("capture", {}).get("region")
+            if not region:
+                raise ValueError("no supervisor.instances and no capture.region configured")
+            instances = [{"name": "main", "region": region, "cores": []}]
+
+        real = [inst.get("name") or f"w{i}" for i, inst in enumerate(instances) if not inst.get("dry_run")]
+        if len(real) > 1:
+            # their clicks would interleave on the one mouse
+            raise ValueError(f"instances {', '.join(real)} all drive the mouse; set dry_run on all but one")
+
+        for i, inst in enumerate(instances):
+            name = inst.get("name") or f"w{i}"
+            # per-instance overrides, then the instance itself so workers only need cfg
+            wcfg = deep_merge(inst.get("overrides", {}), cfg)
+            wcfg["instance"] = inst
+            cores = inst.get("cores") or []
+            wcfg.setdefault("realtime", {})
+            wcfg["realtime"]["capture_cores"] = cores
+            wcfg["realtime"]["control_cores"] = cores
+            self.workers.append(Worker(name, wcfg))
+
+    def _spawn(self, w: Worker) -> None:
+        w.process = self.ctx.Process(
+            target=_worker_main,
+            args=(w.name, w.cfg, self.stats_q, self.stop_event),
+            name=f"worker-{w.name}",
+            daemon=True,
+        )
+        w.process.start()
+        LOG.info("supervisor", f"started {w.name}", pid=w.process.pid, restarts=w.restarts)
+
+    def start(self) -> None:
+        for w in self.workers:
+            self._spawn(w)
+
+    def _drain_stats(self) -> None:
+        by_name = {w.name: w for w in self.workers}
+        while True:
+            try:
+                name, pid, stats = self.stats_q.get_nowait()
+            except queue.Empty:
+                return
+            w = by_name.get(name)
+            if w is None:
+                continue
+            if "error" in stats:
+                LOG.error("supervisor", f"{name}: {stats['error']}", pid=pid)
+                continue
+            if w.process is None or pid != w.process.pid:
+                # late report from a process that was already replaced
+                continue
+            w.stats = stats
+
+    def poll(self) -> None:
+        """
+        Collects stats and restarts dead workers. Call periodically.
+        """
+        self._drain_stats()
+        if self.stop_event.is_set():
+            return
+        now = time.monotonic()
+        for w in self.workers:
+            if w.failed or w.process is None or w.process.is_alive():
+                continue
+            if w.next_start == 0.0:
+                code = w.process.exitcode
+                w.total_ticks += w.stats.get("ticks", 0)
+                w.stats = {}
+                if w.restarts >= self.restart_limit:
+                    w.failed = True
+                    LOG.error("supervisor", f"{w.name} exited ({code}), restart limit reached")
+                    continue
+                w.next_start = now + min(30.0, 0.5 * 2 ** w.restarts)
+                LOG.warn("supervisor", f"{w.name} exited ({code}), restarting", restarts=w.restarts + 1)
+            if now >= w.next_start:
+                w.restarts += 1
+                w.next_start = 0.0
+                self._spawn(w)
+
+    def run(self, seconds: float = 0.0, on_summary=None) -> None:
+        """
+        Supervises until `seconds` pass (0 = until Ctrl+C), calling
+        on_summary(summary) every stats interval.
+        """
+        interval = self.cfg.get("supervisor", {}).get("stats_interval_s", 2.0)
+        self.start()
+        end = time.monotonic() + seconds if seconds else None
+        next_summary = time.monotonic() + interval
+        try:
+            while end is None or time.monotonic() < end:
+                time.sleep(0.1)
+                self.poll()
+                if on_summary is not None and time.monotonic() >= next_summary:
+                    next_summary += interval
+                    on_summary(self.summary())
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 3.0) -> None:
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for w in self.workers:
+            if w.process is None:
+                continue
+            w.process.join(max(0.0, deadline - time.monotonic()))
+            if w.process.is_alive():
+                LOG.warn("supervisor", f"{w.name} did not stop, terminating")
+                w.process.terminate()
+                w.process.join(1.0)
+        self._drain_stats()
+
+    def summary(self) -> Dict[str, Any]:
+        rows = {}
+        for w in self.workers:
+            s = dict(w.stats)
+            s["alive"] = bool(w.process is not None and w.process.is_alive())
+            s["restarts"] = w.restarts
+            s["failed"] = w.failed
+            rows[w.name] = s
+        live = [w.stats for w in self.workers if w.stats]
+        total = {
+            "workers": len(self.workers),
+            "alive": sum(1 for r in rows.values() if r["alive"]),
+            "fps": round(sum(s.get("fps", 0.0) for s in live), 2),
+            "ticks": sum(s.get("ticks", 0) for s in live) + sum(w.total_ticks for w in self.workers),
+            "busy_max_ms": max((s.get("busy_max_ms", 0.0) for s in live), default=0.0),
+            "restarts": sum(w.restarts for w in self.workers),
+        }
+        return {"total": total, "workers": rows}
+
+
+def _print_summary(summary: Dict[str, Any]) -> None:
+    print(f"{'worker':>8} {'alive':>5} {'fps':>8} {'busy_ms':>8} {'max_ms':>8} {'p99_jit':>8} {'restarts':>8}")
+    for name, s in summary["workers"].items():
+        print(f"{name:>8} {str(s['alive']):>5} {s.get('fps', 0):>8} {s.get('busy_mean_ms', 0):>8} "
+              f"{s.get('busy_max_ms', 0):>8} {s.get('jitter_p99_ms', 0):>8} {s['restarts']:>8}")
+    t = summary["total"]
+    print(f"{'total':>8} {t['alive']:>5} {t['fps']:>8} {'':>8} {t['busy_max_ms']:>8} {'':>8} {t['restarts']:>8}")
+    for rec in LOG.drain():
+        print(f"[{rec.level.upper()}] {rec.stage}: {rec.message} {rec.counters or ''}")
+
+
+if __name__ == "__main__":
+    import argparse
+    from copy import deepcopy
+
+    from client.config.config_io import DEFAULT_CONFIG, load_config
+
+    parser = argparse.ArgumentParser(description="Run one headless control loop per configured region")
+    parser.add_argument("--seconds", type=float, default=0.0, help="0 = until Ctrl+C")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="ignore config instances; run N dry-run workers on synthetic frames, one per core")
+    parser.add_argument("--hz", type=int, default=240, help="loop rate for --synthetic")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        cfg = deepcopy(DEFAULT_CONFIG)
+        cfg["capture"]["backend"] = "synthetic"
+        cfg["control"]["loop_hz"] = args.hz
+        ncores = os.cpu_count() or 1
+        cfg["supervisor"]["instances"] = [
+            {"name": f"sim{i}", "region": {"x": 0, "y": 0, "w": 95, "h": 380},
+             "cores": [i % ncores], "dry_run": True}
+            for i in range(args.synthetic)
+        ]
+    else:
+        cfg = load_config()
+
+    sup = Supervisor(cfg)
+    sup.run(args.seconds, on_summary=_print_summary)
+    print("final:")
+    _print_summary(sup.summary())
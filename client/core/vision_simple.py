@@ -1,7 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Callable, Dict, Optional
 import numpy as np
+from .log_ring import LOG
 
 
 @dataclass
@@ -10,46 +11,235 @@ class DetectionResult:
     bar_y: Optional[int]
     distance: Optional[float]
     active: bool
+    captured_at: Optional[float] = None  # perf_counter() of the frame's capture, if known
 
 
-def detect_zone_and_bar_bgra(raw: bytes, w: int, h: int) -> DetectionResult:
-  
+# edit as needed until working - faye in class
+CROP_LEFT = 0.40
+CROP_RIGHT = 0.60
 
-    if not raw or w <= 0 or h <= 0:
-        return DetectionResult(None, None, None, False)
+# edit thresholds as needed (brightness = B + G + R, 0..765)
+WHITE_THRESHOLD = 650
+BLACK_THRESHOLD = 100
+
+# a row needs at least this many white/black pixels to count as a peak
+MIN_SIGNAL = 2
+
+
+@dataclass(frozen=True)
+class DetectParams:
+    """
+    Detector settings; the defaults are the values tuned by hand above.
+    Comes from config["vision"] (see params_from_config / debug/tune_vision.py).
+    """
+    white_threshold: int = WHITE_THRESHOLD
+    black_threshold: int = BLACK_THRESHOLD
+    crop_left: float = CROP_LEFT
+    crop_right: float = CROP_RIGHT
+    min_signal: int = MIN_SIGNAL
+
+
+_legacy_warned = False
+
+
+def params_from_config(vision: Dict[str, Any]) -> DetectParams:
+    global _legacy_warned
+    defaults = DetectParams()
+    if vision.get("thresholds_version", 1) < 1:
+        # pre-tuning thresholds (see config_io.migrate_config): keep the hand-tuned ones
+        if not _legacy_warned:
+            _legacy_warned = True
+            LOG.warn("vision", "ignoring white/black_threshold from a pre-tuning config; "
+                               "set vision.thresholds_version to 1 to use them",
+                     white_threshold=vision.get("white_threshold"), black_threshold=vision.get("black_threshold"))
+        vision = {k: v for k, v in vision.items() if k not in ("white_threshold", "black_threshold")}
+    return DetectParams(
+        white_threshold=vision.get("white_threshold", defaults.white_threshold),
+        black_threshold=vision.get("black_threshold", defaults.black_threshold),
+        crop_left=vision.get("crop_left", defaults.crop_left),
+        crop_right=vision.get("crop_right", defaults.crop_right),
+        min_signal=vision.get("min_signal", defaults.min_signal),
+    )
 
-    # Convert BGRA → (h, w, 4)
-    arr = np.frombuffer(raw, dtype=np.uint8)
-    try:
-        arr = arr.reshape((h, w, 4))
-    except ValueError:
-        return DetectionResult(None, None, None, False)
 
-    # Convert to brightness
-    rgb = arr[..., :3]
-    brightness = rgb.sum(axis=2)
+class DetectWork:
+    """
+    Preallocated scratch arrays for one region size, so the per-frame
+    detection path doesn't allocate (see frame_pool.FramePool).
+    """
 
-  
-    
-    # edit as needed until working - faye in class
-    CROP_LEFT = int(w * 0.40)
-    CROP_RIGHT = int(w * 0.60)
+    def __init__(self, w: int, h: int, params: Optional[DetectParams] = None) -> None:
+        self.w = w
+        self.h = h
+        self.params = params or DetectParams()
+        self.crop_left = int(w * self.params.crop_left)
+        self.crop_right = int(w * self.params.crop_right)
+        cw = self.crop_right - self.crop_left
 
-    cropped = brightness[:, CROP_LEFT:CROP_RIGHT]
+        # everything in uint16 so no ufunc needs a casting buffer
+        self.brightness = np.empty((h, cw), dtype=np.uint16)
+        self.channel = np.empty((h, cw), dtype=np.uint16)
+        self.mask = np.empty((h, cw), dtype=bool)
+        self.mask16 = np.empty((h, cw), dtype=np.uint16)
+        self.white_counts = np.empty(h, dtype=np.uint16)
+        self.black_counts = np.empty(h, dtype=np.uint16)
 
-    # edit thresholds as needed
-    white_mask = cropped > 650
-    black_mask = cropped < 100
+        # row-count kernel (see kernels.py); NumPy reference unless swapped
+        self.row_counts: Callable[[np.ndarray, "DetectWork", slice], None] = row_counts_numpy
 
-    white_counts = white_mask.sum(axis=1)
-    black_counts = black_mask.sum(axis=1)
+
+def _brightness(cropped: np.ndarray, out: np.ndarray, channel: np.ndarray) -> None:
+    # B + G + R into a uint16 array (channel is uint16 scratch of the same shape)
+    np.copyto(out, cropped[..., 0])
+    np.copyto(channel, cropped[..., 1])
+    np.add(out, channel, out=out)
+    np.copyto(channel, cropped[..., 2])
+    np.add(out, channel, out=out)
+
+
+def _count_rows(mask: np.ndarray, mask16: np.ndarray, out: np.ndarray) -> None:
+    np.copyto(mask16, mask)
+    np.add.reduce(mask16, axis=1, out=out)
+
+
+def row_counts_numpy(cropped: np.ndarray, work: DetectWork, rows: slice = slice(None)) -> None:
+    """
+    Reference row-count kernel: for each row of the (n, cw, 4) crop, count
+    pixels brighter than params.white_threshold / darker than
+    params.black_threshold into work.white_counts[rows] / work.black_counts[rows].
+    """
+    brightness = work.brightness[rows]
+    _brightness(cropped, brightness, work.channel[rows])
+
+    mask = work.mask[rows]
+    mask16 = work.mask16[rows]
+
+    np.greater(brightness, work.params.white_threshold, out=mask)
+    _count_rows(mask, mask16, work.white_counts[rows])
+
+    np.less(brightness, work.params.black_threshold, out=mask)
+    _count_rows(mask, mask16, work.black_counts[rows])
+
+
+def detect_zone_and_bar_pixels(pixels: np.ndarray, work: DetectWork) -> DetectionResult:
+    """
+    Same detection as detect_zone_and_bar_bgra, on an (h, w, 4) BGRA array,
+    writing every intermediate into `work`.
+    """
+    cropped = pixels[:, work.crop_left:work.crop_right]
+    work.row_counts(cropped, work, slice(None))
 
     # Require minimal signal
-    if white_counts.max() < 2 or black_counts.max() < 2:
+    min_signal = work.params.min_signal
+    if work.white_counts.max() < min_signal or work.black_counts.max() < min_signal:
+        return DetectionResult(None, None, None, False)
+
+    white_y = int(np.argmax(work.white_counts))
+    bar_y = int(np.argmax(work.black_counts))
+
+    distance = float(white_y - bar_y)
+    return DetectionResult(white_y, bar_y, distance, True)
+
+
+class PyramidWork(DetectWork):
+    """
+    DetectWork plus the coarse level for detect_zone_and_bar_pyramid:
+    every `factor`-th crop column, rows pooled in blocks of `factor`.
+    """
+
+    def __init__(self, w: int, h: int, factor: int = 4, params: Optional[DetectParams] = None) -> None:
+        super().__init__(w, h, params)
+        self.factor = factor
+        cols = len(range(self.crop_left, self.crop_right, factor))
+        self.blocks = -(-h // factor)
+        padded = self.blocks * factor
+
+        # rows past h stay mid-grey: neither white nor black
+        mid = (self.params.white_threshold + self.params.black_threshold) // 2
+        self.coarse_brightness = np.full((padded, cols), mid, dtype=np.uint16)
+        self.coarse_channel = np.empty((h, cols), dtype=np.uint16)
+        self.coarse_mask = np.empty((padded, cols), dtype=bool)
+        self.block_mask = np.empty((self.blocks, cols), dtype=bool)
+        self.block_mask16 = np.empty((self.blocks, cols), dtype=np.uint16)
+        self.white_blocks = np.empty(self.blocks, dtype=np.uint16)
+        self.black_blocks = np.empty(self.blocks, dtype=np.uint16)
+
+
+def _refine(pixels: np.ndarray, work: PyramidWork, block: int, white: bool) -> int:
+    # full-resolution row counts over the coarse block and one block either side
+    f = work.factor
+    r0 = max(0, (block - 1) * f)
+    r1 = min(work.h, (block + 2) * f)
+    rows = slice(r0, r1)
+
+    cropped = pixels[rows, work.crop_left:work.crop_right]
+    work.row_counts(cropped, work, rows)
+
+    counts = work.white_counts[rows] if white else work.black_counts[rows]
+    if counts.max() < work.params.min_signal:
+        return -1
+    return r0 + int(np.argmax(counts))
+
+
+def detect_zone_and_bar_pyramid(pixels: np.ndarray, work: PyramidWork, tolerance_px: int = 0) -> DetectionResult:
+    """
+    Two-level version of detect_zone_and_bar_pixels for tall regions:
+    - find the white-line and bar blocks on a column-strided, row-pooled image
+    - re-run the exact row counts only in a few rows around each block
+
+    tolerance_px: accepted error in rows. Below `factor` the peaks are refined
+    at full resolution; at or above it the coarse block centre is returned.
+    """
+    f = work.factor
+    h = work.h
+    cropped = pixels[:, work.crop_left:work.crop_right:f]
+    coarse = work.coarse_brightness
+    _brightness(cropped, coarse[:h], work.coarse_channel)
+
+    # a block counts a column if any of its rows passes the threshold,
+    # so 1px lines survive the row pooling
+    pooled = work.coarse_mask.reshape(work.blocks, f, -1)
+
+    np.greater(coarse, work.params.white_threshold, out=work.coarse_mask)
+    np.logical_or.reduce(pooled, axis=1, out=work.block_mask)
+    _count_rows(work.block_mask, work.block_mask16, work.white_blocks)
+
+    np.less(coarse, work.params.black_threshold, out=work.coarse_mask)
+    np.logical_or.reduce(pooled, axis=1, out=work.block_mask)
+    _count_rows(work.block_mask, work.block_mask16, work.black_blocks)
+
+    if work.white_blocks.max() < 1 or work.black_blocks.max() < 1:
         return DetectionResult(None, None, None, False)
 
-    white_y = int(np.argmax(white_counts))
-    bar_y = int(np.argmax(black_counts))
+    white_block = int(np.argmax(work.white_blocks))
+    bar_block = int(np.argmax(work.black_blocks))
+
+    if tolerance_px >= f:
+        white_y = min(h - 1, white_block * f + f // 2)
+        bar_y = min(h - 1, bar_block * f + f // 2)
+    else:
+        white_y = _refine(pixels, work, white_block, True)
+        bar_y = _refine(pixels, work, bar_block, False)
+        if white_y < 0 or bar_y < 0:
+            return DetectionResult(None, None, None, False)
 
     distance = float(white_y - bar_y)
     return DetectionResult(white_y, bar_y, distance, True)
+
+
+def detect_zone_and_bar_bgra(raw: bytes, w: int, h: int, work: Optional[DetectWork] = None) -> DetectionResult:
+
+
+    if not raw or w <= 0 or h <= 0:
+        return DetectionResult(None, None, None, False)
+
+    # Convert BGRA → (h, w, 4)
+    arr = np.frombuffer(raw, dtype=np.uint8)
+    try:
+        arr = arr.reshape((h, w, 4))
+    except ValueError:
+        return DetectionResult(None, None, None, False)
+
+    if work is None or work.w != w or work.h != h:
+        work = DetectWork(w, h)
+    return detect_zone_and_bar_pixels(arr, work)
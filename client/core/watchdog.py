@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .log_ring import LOG
+
+
+class FrameWatchdog:
+    """
+    Releases input when the capture loop stops producing frames.
+    - The loop calls feed(captured_at) for every frame (a float store, no locking)
+    - A daemon thread checks every timeout / 4; once the newest frame is older
+      than `timeout` it calls on_stall() once and logs an alert
+    - The next fed frame ends the stall and is counted as late
+    - While the loop sets `idle` (blocked waiting for damage) the limit grows
+      by `idle_allowance`, the longest it goes without a forced capture
+    """
+
+    def __init__(
+        self,
+        timeout: float,
+        on_stall: Callable[[], None],
+        on_recover: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self.timeout = timeout
+        self.on_stall = on_stall
+        self.on_recover = on_recover
+        self.idle_allowance = 0.0
+        self.idle = False
+
+        self.stalled = False
+        self.stalls = 0   # times the watchdog fired
+        self.late = 0     # frames that arrived after the watchdog fired
+
+        self._last_frame = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def feed(self, captured_at: float) -> None:
+        self._last_frame = captured_at
+        if self.stalled:
+            self.stalled = False
+            self.late += 1
+            LOG.info("watchdog", "frames resumed", late=self.late)
+            if self.on_recover is not None:
+                self.on_recover()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._last_frame = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="FrameWatchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        interval = self.timeout / 4.0
+        while not self._stop.wait(interval):
+            age = time.perf_counter() - self._last_frame
+            limit = self.timeout + self.idle_allowance if self.idle else self.timeout
+            if age <= limit or self.stalled:
+                continue
+            self.stalled = True
+            self.stalls += 1
+            try:
+                self.on_stall()
+            except Exception as e:
+                LOG.error("watchdog", f"release failed: {e}")
+            LOG.error("watchdog", f"no new frame for {age * 1000:.0f} ms, input released", stalls=self.stalls)
+
+    def summary(self) -> Dict[str, int]:
+        return {"stalls": self.stalls, "late": self.late}
@@ -0,0 +1,173 @@
+# client/debug/bench.py
+"""
+Throughput regression benchmarks. Everything runs on synthetic frames with
+a fake input backend, so no screen, game or mouse is touched.
+
+    python -m client.debug.bench                       # print results
+    python -m client.debug.bench --save baseline.json  # store a baseline
+    python -m client.debug.bench --compare baseline.json --max-regress 15
+                                                       # exit 1 on regression
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from copy import deepcopy
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from client.config.config_io import DEFAULT_CONFIG, load_config, save_config
+from client.core.capture import SyntheticBackend
+from client.core.controller import Controller
+from client.core.frame_pool import FrameBuffer
+from client.core.loop import ControlLoop
+from client.core.sim import render_frame
+from client.core.vision_simple import DetectionResult, DetectWork, detect_zone_and_bar_pixels
+
+REGION = {"x": 0, "y": 0, "w": 95, "h": 380}
+DETECT_SIZES = [(95, 380), (190, 760), (400, 1600)]
+
+
+def _fake_input() -> None:
+    pass
+
+
+def measure(fn: Callable[[], Any], iters: int, rounds: int = 7) -> float:
+    """
+    Best over rounds of the mean microseconds per call (the minimum is the
+    least noisy estimate on a shared machine).
+    """
+    fn()
+    samples = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for _ in range(iters):
+            fn()
+        samples.append((time.perf_counter() - t0) / iters * 1e6)
+    return min(samples)
+
+
+def bench_capture(iters: int) -> float:
+    backend = SyntheticBackend(REGION)
+    buf = FrameBuffer(REGION["w"], REGION["h"])
+    return measure(lambda: backend.grab_into(buf), iters)
+
+
+def bench_detect(w: int, h: int, iters: int) -> float:
+    work = DetectWork(w, h)
+    frames = [render_frame(w, h, h // 3, (h // 2 + 7 * i) % (h - 3)) for i in range(8)]
+    i = iter(range(1 << 62))
+    return measure(lambda: detect_zone_and_bar_pixels(frames[next(i) % 8], work), iters)
+
+
+def bench_controller(iters: int) -> float:
+    ctrl = Controller(press=_fake_input, release=_fake_input)
+    ctrl.cooldown = 0.0
+    results = [DetectionResult(150, 150 + d, float(-d), True) for d in range(-30, 31, 3)]
+    results.append(DetectionResult(None, None, None, False))
+    i = iter(range(1 << 62))
+    return measure(lambda: ctrl.update(results[next(i) % len(results)]), iters)
+
+
+def bench_config_load(iters: int) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "config.json")
+        cfg = deepcopy(DEFAULT_CONFIG)
+        cfg["capture"]["region"] = dict(REGION)
+        save_config(cfg, path)
+        return measure(lambda: load_config(path), iters)
+
+
+def bench_tick(iters: int) -> float:
+    cfg = deepcopy(DEFAULT_CONFIG)
+    ctrl = Controller(press=_fake_input, release=_fake_input)
+    loop = ControlLoop(REGION, cfg, controller=ctrl, backend=SyntheticBackend(REGION, cfg))
+    # loop.open() is skipped: no backend probing, reference kernel stays in place
+
+    def tick() -> None:
+        buf, _ = loop.tick()
+        if buf is not None:
+            buf.release()
+
+    return measure(tick, iters)
+
+
+def run_all(iters: int) -> Dict[str, float]:
+    metrics: Dict[str, float] = {}
+    metrics["capture_synthetic_us"] = bench_capture(iters)
+    for w, h in DETECT_SIZES:
+        metrics[f"detect_{w}x{h}_us"] = bench_detect(w, h, iters)
+    metrics["controller_update_us"] = bench_controller(iters * 10)
+    metrics["config_load_us"] = bench_config_load(max(1, iters // 10))
+    metrics["headless_tick_us"] = bench_tick(iters)
+    return metrics
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float], max_regress: float) -> List[str]:
+    """
+    Returns one line per metric that got slower than baseline by more than max_regress percent,
+    or that the baseline has but the current run no longer reports (renamed or broken).
+    """
+    failures = []
+    for name, base in baseline.items():
+        now = current.get(name)
+        if now is None:
+            failures.append(f"{name}: in baseline but missing from this run")
+            continue
+        if base <= 0:
+            continue
+        change = (now - base) / base * 100.0
+        if change > max_regress:
+            failures.append(f"{name}: {base:.1f} -> {now:.1f} us (+{change:.1f}%)")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iters", type=int, default=300)
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare against a JSON baseline")
+    parser.add_argument("--max-regress", type=float, default=10.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+
+    metrics = run_all(args.iters)
+    for name, us in metrics.items():
+        print(f"{name:>24}: {us:10.2f} us")
+
+    if args.save:
+        doc = {
+            "metrics": metrics,
+            "meta": {
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "machine": platform.machine(),
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "iters": args.iters,
+            },
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+        print(f"Saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["metrics"]
+        failures = compare(metrics, baseline, args.max_regress)
+        if failures:
+            print(f"REGRESSION (> {args.max_regress:.0f}%):")
+            for line in failures:
+                print("  " + line)
+            return 1
+        print(f"OK: no metric regressed more than {args.max_regress:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
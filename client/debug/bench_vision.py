@@ -0,0 +1,78 @@
+# client/debug/bench_vision.py
+"""
+Detection latency vs region height: full-resolution detector next to the
+coarse-to-fine pyramid, on synthetic frames.
+
+    python -m client.debug.bench_vision [--iters 300] [--factors 2 4 8]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from client.core.sim import render_frame
+from client.core.vision_simple import (
+    DetectWork,
+    PyramidWork,
+    detect_zone_and_bar_pixels,
+    detect_zone_and_bar_pyramid,
+)
+
+HEIGHTS = [100, 200, 400, 800, 1600]
+
+
+def _time_us(fn: Callable[[], object], iters: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - t0) / iters * 1e6
+
+
+def main(iters: int, factors: List[int], tolerance_px: int) -> None:
+    rng = np.random.default_rng(0)
+    header = f"{'h':>6} {'w':>5} {'full_us':>9}"
+    for f in factors:
+        header += f" {'pyr' + str(f) + '_us':>9} {'max_err':>7}"
+    print(header)
+
+    for h in HEIGHTS:
+        w = max(40, h // 4)   # regions get wider with height on high-DPI screens
+        frames = [
+            render_frame(w, h, int(rng.integers(0, h)), int(rng.integers(0, h - 3)))
+            for _ in range(16)
+        ]
+        work = DetectWork(w, h)
+        i = iter(range(1 << 30))
+        full_us = _time_us(lambda: detect_zone_and_bar_pixels(frames[next(i) % 16], work), iters)
+        row = f"{h:>6} {w:>5} {full_us:>9.1f}"
+
+        for f in factors:
+            pwork = PyramidWork(w, h, f)
+            j = iter(range(1 << 30))
+            pyr_us = _time_us(
+                lambda: detect_zone_and_bar_pyramid(frames[next(j) % 16], pwork, tolerance_px), iters
+            )
+            err = 0
+            for px in frames:
+                a = detect_zone_and_bar_pixels(px, work)
+                b = detect_zone_and_bar_pyramid(px, pwork, tolerance_px)
+                if a.active != b.active:
+                    err = h
+                    break
+                if a.active:
+                    err = max(err, abs(a.white_y - b.white_y), abs(a.bar_y - b.bar_y))
+            row += f" {pyr_us:>9.1f} {err:>7}"
+        print(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iters", type=int, default=300)
+    parser.add_argument("--factors", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--tolerance", type=int, default=0, help="pyramid tolerance_px")
+    args = parser.parse_args()
+    main(args.iters, args.factors, args.tolerance)
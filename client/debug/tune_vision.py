@@ -0,0 +1,258 @@
+# client/debug/tune_vision.py
+"""
+Offline detector tuning over labeled recordings.
+
+A recording is a directory with
+    frames.npy   (N, h, w, 4) uint8 BGRA frames
+    labels.json  [{"white_y": int|null, "bar_y": int|null}, ...]  (null = no minigame on screen)
+
+Every combination of thresholds, crop band, pyramid factor and kernel is
+replayed over the recording in a process pool (pyramid factors only when the
+recording is at least vision.pyramid_min_height tall, as ControlLoop only uses
+the pyramid then). The accuracy-vs-latency
+frontier is printed and the cheapest setting that reaches --min-accuracy
+can be written to config.json.
+
+    python -m client.debug.tune_vision synth rec/ [--frames 400]   # labeled synthetic recording
+    python -m client.debug.tune_vision run rec/ --min-accuracy 0.99 [--write]
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from client.config.config_io import load_config, save_config
+from client.core.kernels import available_kernels, select_kernel
+from client.core.sim import render_frame
+from client.core.vision_simple import (
+    DetectParams,
+    DetectWork,
+    PyramidWork,
+    detect_zone_and_bar_pixels,
+    detect_zone_and_bar_pyramid,
+)
+
+WHITE_THRESHOLDS = [550, 600, 650, 700]
+BLACK_THRESHOLDS = [60, 100, 150]
+CROPS = [(0.40, 0.60), (0.30, 0.70), (0.45, 0.55)]
+PYRAMID_FACTORS = [1, 2, 4]
+
+# keys written to config["vision"]
+SETTING_KEYS = ("white_threshold", "black_threshold", "crop_left", "crop_right", "pyramid_factor", "kernel")
+
+
+def load_recording(path: str):
+    frames = np.load(os.path.join(path, "frames.npy"), mmap_mode="r")
+    with open(os.path.join(path, "labels.json"), "r", encoding="utf-8") as f:
+        labels = json.load(f)
+    if len(labels) != len(frames):
+        raise ValueError(f"{path}: {len(frames)} frames but {len(labels)} labels")
+    return frames, labels
+
+
+def synth_recording(path: str, frames: int = 400, w: int = 95, h: int = 380, seed: int = 0) -> None:
+    """
+    Writes a labeled recording from the simulator with the things real
+    captures have: sensor-ish noise, a dimmer/brighter white line, a grey-ish
+    bar, and bright/dark clutter near the edges of the region.
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(path, exist_ok=True)
+    data = np.empty((frames, h, w, 4), dtype=np.uint8)
+    labels: List[Dict[str, Optional[int]]] = []
+
+    for i in range(frames):
+        active = rng.random() > 0.15
+        white_y = int(rng.integers(10, h - 10)) if active else None
+        bar_y = int(rng.integers(0, h - 3)) if active else None
+        if active and abs(bar_y - white_y) < 4:
+            bar_y = (white_y + 20) % (h - 3)
+        frame = render_frame(w, h, white_y, bar_y).astype(np.int16)
+
+        if active:
+            frame[white_y, :, :3] = rng.integers(200, 256)
+            frame[bar_y:bar_y + 3, :, :3] = rng.integers(0, 45)
+
+        # clutter in the outer columns only: a narrow crop band ignores it
+        for _ in range(3):
+            y = int(rng.integers(0, h))
+            x0 = int(rng.integers(0, int(w * 0.3)))
+            if rng.random() < 0.5:
+                x0 = w - 1 - x0
+            lo, hi = sorted((x0, int(w * 0.35) if x0 < w // 2 else int(w * 0.65)))
+            frame[y, lo:hi, :3] = 255 if rng.random() < 0.5 else 0
+
+        frame[..., :3] += rng.normal(0, 14, (h, w, 3)).astype(np.int16)
+        data[i] = np.clip(frame, 0, 255).astype(np.uint8)
+        data[i, ..., 3] = 255
+        labels.append({"white_y": white_y, "bar_y": bar_y})
+
+    np.save(os.path.join(path, "frames.npy"), data)
+    with open(os.path.join(path, "labels.json"), "w", encoding="utf-8") as f:
+        json.dump(labels, f)
+
+
+def settings_grid(kernels: List[str], h: int, pyramid_min_height: int) -> List[Dict[str, Any]]:
+    # below pyramid_min_height ControlLoop runs full resolution whatever the factor says
+    factors = PYRAMID_FACTORS if h >= pyramid_min_height else [1]
+    grid = []
+    for white, black, (left, right), factor, kernel in itertools.product(
+        WHITE_THRESHOLDS, BLACK_THRESHOLDS, CROPS, factors, kernels
+    ):
+        grid.append({
+            "white_threshold": white,
+            "black_threshold": black,
+            "crop_left": left,
+            "crop_right": right,
+            "pyramid_factor": factor,
+            "kernel": kernel,
+        })
+    return grid
+
+
+def evaluate(path: str, setting: Dict[str, Any], tolerance_px: int, rounds: int = 3) -> Dict[str, Any]:
+    """
+    Replays one setting over the recording (runs in a worker process).
+    A frame counts as correct when activity matches the label and both
+    lines are within tolerance_px. Latency is the best mean over rounds.
+    """
+    frames, labels = load_recording(path)
+    frames = np.ascontiguousarray(frames)
+    n, h, w, _ = frames.shape
+    params = DetectParams(
+        white_threshold=setting["white_threshold"],
+        black_threshold=setting["black_threshold"],
+        crop_left=setting["crop_left"],
+        crop_right=setting["crop_right"],
+    )
+    factor = setting["pyramid_factor"]
+    if factor > 1:
+        work = PyramidWork(w, h, factor, params)
+        detect = lambda px: detect_zone_and_bar_pyramid(px, work, 0)
+    else:
+        work = DetectWork(w, h, params)
+        detect = lambda px: detect_zone_and_bar_pixels(px, work)
+    work.row_counts = select_kernel(setting["kernel"], w, h)
+    # select_kernel falls back to numpy; report what actually ran
+    setting = {**setting, "kernel": work.row_counts.name}
+
+    correct = 0
+    for px, label in zip(frames, labels):
+        r = detect(px)
+        if label["white_y"] is None:
+            correct += not r.active
+        elif (r.active and abs(r.white_y - label["white_y"]) <= tolerance_px
+              and abs(r.bar_y - label["bar_y"]) <= tolerance_px):
+            correct += 1
+
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for px in frames:
+            detect(px)
+        best = min(best, (time.perf_counter() - t0) / n * 1e6)
+
+    return {**setting, "accuracy": correct / n, "latency_us": best}
+
+
+def pareto_frontier(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Settings not beaten on both accuracy and latency, fastest first.
+    """
+    frontier: List[Dict[str, Any]] = []
+    for r in sorted(results, key=lambda r: (r["latency_us"], -r["accuracy"])):
+        if not frontier or r["accuracy"] > frontier[-1]["accuracy"]:
+            frontier.append(r)
+    return frontier
+
+
+def choose(frontier: List[Dict[str, Any]], min_accuracy: float) -> Optional[Dict[str, Any]]:
+    for r in frontier:
+        if r["accuracy"] >= min_accuracy:
+            return r
+    return None
+
+
+def write_setting(setting: Dict[str, Any], path: Optional[str] = None) -> None:
+    cfg = load_config(path)
+    for key in SETTING_KEYS:
+        cfg["vision"][key] = setting[key]
+    # tuned thresholds are meant to be used, even in a pre-tuning config
+    cfg["vision"]["thresholds_version"] = 1
+    save_config(cfg, path)
+
+
+def run(args: argparse.Namespace) -> int:
+    installed = available_kernels()
+    kernels = [k for k in args.kernels or installed if k in installed]
+    for k in set(args.kernels or []) - set(installed):
+        print(f"kernel {k} not installed, skipped")
+    h = load_recording(args.recording)[0].shape[1]
+    min_height = load_config(args.config)["vision"]["pyramid_min_height"]
+    grid = settings_grid(kernels, h, min_height)
+    print(f"Evaluating {len(grid)} settings on {args.jobs} processes...")
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [pool.submit(evaluate, args.recording, s, args.tolerance) for s in grid]
+        results = [f.result() for f in futures]
+    print(f"done in {time.perf_counter() - t0:.1f} s")
+
+    frontier = pareto_frontier(results)
+    print(f"{'accuracy':>8} {'us/frame':>9} {'white':>5} {'black':>5} {'crop':>10} {'pyr':>3} kernel")
+    for r in frontier:
+        print(f"{r['accuracy']:>8.4f} {r['latency_us']:>9.1f} {r['white_threshold']:>5} "
+              f"{r['black_threshold']:>5} {r['crop_left']:.2f}-{r['crop_right']:.2f} "
+              f"{r['pyramid_factor']:>3} {r['kernel']}")
+
+    chosen = choose(frontier, args.min_accuracy)
+    if chosen is None:
+        print(f"No setting reaches accuracy {args.min_accuracy}")
+        return 1
+    print("Chosen: " + ", ".join(f"{k}={chosen[k]}" for k in SETTING_KEYS))
+
+    if args.write:
+        write_setting(chosen, args.config)
+        print("Saved to config.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_synth = sub.add_parser("synth", help="write a labeled synthetic recording")
+    p_synth.add_argument("recording")
+    p_synth.add_argument("--frames", type=int, default=400)
+    p_synth.add_argument("--w", type=int, default=95)
+    p_synth.add_argument("--h", type=int, default=380)
+    p_synth.add_argument("--seed", type=int, default=0)
+
+    p_run = sub.add_parser("run", help="evaluate the settings grid")
+    p_run.add_argument("recording")
+    p_run.add_argument("--tolerance", type=int, default=3, help="px error still counted as correct")
+    p_run.add_argument("--min-accuracy", type=float, default=0.99)
+    p_run.add_argument("--kernels", nargs="*", help="default: every installed kernel")
+    p_run.add_argument("--jobs", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                       help="worker processes (fewer than cores keeps latency numbers honest)")
+    p_run.add_argument("--write", action="store_true", help="store the chosen setting in config.json")
+    p_run.add_argument("--config", help="config path (default: client/config/config.json)")
+    args = parser.parse_args()
+
+    if args.cmd == "synth":
+        synth_recording(args.recording, args.frames, args.w, args.h, args.seed)
+        print(f"Wrote {args.frames} frames to {args.recording}")
+        return 0
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,13 @@
 # client/ui/app_qt.py
 from client.ui.widgets.preview_widget import PreviewWidget
+from client.ui.widgets.log_widget import LogWidget
+from client.ui.widgets.history_plot import HistoryPlot
 
 import os
 from client.ui.region_select_qt import RegionSelectOverlay
 from client.config.config_io import load_config, save_config, set_capture_region
-from PySide6.QtCore import Qt
+from client.core.realtime import ThreadCpuMeter
+from PySide6.QtCore import Qt, QEvent, QTimer
 from PySide6.QtGui import QMovie, QGuiApplication
 from PySide6.QtWidgets import (
     QLabel, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -30,6 +33,11 @@ class MainWindow(QMainWindow):
         self.runner = None
         self.is_running = False
 
+        # performance mode: see _apply_perf_mode
+        self.ui_cfg = self.cfg.get("ui", {})
+        self.perf_active = False
+        self.cpu_meter = ThreadCpuMeter()  # GUI thread CPU, idle vs running
+
         root = QWidget()
         self.setCentralWidget(root)
         main = QVBoxLayout(root)
@@ -61,7 +69,11 @@ class MainWindow(QMainWindow):
         self.status = QLabel("STATE: IDLE")
         self.status.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
 
+        self.cpu_label = QLabel("GUI CPU: -")
+        self.cpu_label.setAlignment(Qt.AlignCenter)
+
         top.addWidget(self.title, 1)
+        top.addWidget(self.cpu_label, 1)
         top.addWidget(self.status, 1)
         main.addLayout(top)
 
@@ -114,6 +126,10 @@ class MainWindow(QMainWindow):
         self.btn_stop.clicked.connect(self.on_stop)
         self.btn_calibrate.clicked.connect(self.on_calibrate)
 
+        left_layout.addWidget(QLabel("LOG:"))
+        self.log_view = LogWidget(min_level=self.cfg.get("debug", {}).get("log_level", "info"))
+        left_layout.addWidget(self.log_view, 1)
+
         # Right content
         right_layout = right.layout()
         right_layout.addWidget(QLabel("LIVE FEED:"))
@@ -136,6 +152,11 @@ class MainWindow(QMainWindow):
         self.preview = PreviewWidget()
         right_layout.addWidget(self.preview, 1)
 
+        right_layout.addWidget(QLabel("DISTANCE / HOLD:"))
+        self.history_plot = HistoryPlot()
+        self.history_plot.setFixedHeight(110)
+        right_layout.addWidget(self.history_plot)
+
         # Wire toggles (no-op for now; overlay always on)
         for cb in (self.cb_zone, self.cb_bar, self.cb_nums):
             cb.stateChanged.connect(self._apply_overlay_flags)
@@ -143,6 +164,11 @@ class MainWindow(QMainWindow):
         self._apply_overlay_flags()
         self._refresh()
 
+        # Status/CPU labels refresh at a few Hz from this timer instead of per frame
+        self.status_timer = QTimer(self)
+        self.status_timer.timeout.connect(self._update_status)
+        self.status_timer.start(1000 // self.ui_cfg.get("status_hz", 4))
+
     def _panel(self) -> QFrame:
         panel = QFrame()
         panel.setObjectName("Panel")
@@ -162,6 +188,72 @@ class MainWindow(QMainWindow):
         # You can later wire these to enable/disable drawing if you want.
         pass
 
+    def _gui_mode(self) -> str:
+        return "running" if self.is_running else "idle"
+
+    def _update_status(self):
+        self.cpu_meter.sample(self._gui_mode())
+        if self.isMinimized():
+            return
+
+        if self.is_running and self.runner is not None:
+            # draws only the rows added since the last tick of this timer
+            self.history_plot.refresh()
+
+            result = self.runner.last_result
+            text = "STATE: RUNNING"
+            if result is not None and result.active:
+                text += f"  dist={result.distance:.0f}"
+            watchdog = self.runner.loop.watchdog
+            if watchdog is not None and watchdog.stalled:
+                text += "  CAPTURE STALLED"
+            if text != self.status.text():
+                self.status.setText(text)
+
+        parts = []
+        for mode in ("idle", "running"):
+            pct = self.cpu_meter.percent(mode)
+            parts.append(f"{mode} {pct:.1f}%" if pct is not None else f"{mode} -")
+        text = "GUI CPU: " + " / ".join(parts)
+        if text != self.cpu_label.text():
+            self.cpu_label.setText(text)
+
+    def _apply_perf_mode(self):
+        """
+        Performance mode (ui.performance_mode), while running or minimized:
+        - blinker animation paused
+        - runner publishes preview frames at ui.preview_hz (0 = not at all)
+        The idle preview repaint timer only runs while idle and visible.
+        """
+        minimized = self.isMinimized()
+        self.perf_active = bool(self.ui_cfg.get("performance_mode", True)) and (self.is_running or minimized)
+
+        if self.movie is not None:
+            self.movie.setPaused(self.perf_active)
+
+        if self.runner is not None:
+            preview_hz = self.ui_cfg.get("preview_hz", 5)
+            if not self.cfg.get("debug", {}).get("show_preview", True):
+                interval = None
+            elif self.perf_active:
+                interval = 1.0 / preview_hz if preview_hz > 0 else None
+            else:
+                interval = 0.0
+            self.runner.publish_interval = interval
+            self.preview.set_message("PREVIEW OFF (performance mode)" if interval is None else None)
+        else:
+            self.preview.set_message(None)
+
+        if self.is_running or minimized:
+            self.preview.timer.stop()
+        elif not self.preview.timer.isActive():
+            self.preview.timer.start()
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.WindowStateChange:
+            self._apply_perf_mode()
+        super().changeEvent(event)
+
     def _refresh(self):
         self.cfg = load_config()
         self.region_label.setText(self._region_text())
@@ -200,38 +292,39 @@ class MainWindow(QMainWindow):
         print("START CLICKED")
 
         self.cfg = load_config()
+        self.ui_cfg = self.cfg.get("ui", {})
         region = self.cfg["capture"]["region"]
 
         from client.core.runner import Runner
-        self.runner = Runner(region)
+        self.runner = Runner(region, self.cfg)
 
         self.runner.frame_ready.connect(self.preview.update_frame)
+        self.history_plot.set_history(self.runner.loop.history)
 
-        # Stop preview timer (runner will push frames)
-        self.preview.timer.stop()
+        self.cpu_meter.sample("idle")
+        self.is_running = True
+        # preview rate is set before the first frame; also stops the preview timer (runner pushes frames)
+        self._apply_perf_mode()
 
         self.runner.start()
 
-        self.is_running = True
         self.status.setText("STATE: RUNNING")
         self._refresh()
 
     def on_stop(self):
         if self.runner:
-            try:
-                # New Controller API: reset() instead of force_release()
-                self.runner.controller.reset()
-            except Exception:
-                pass
-
+            # the runner releases the mouse on its own thread before it exits
             self.runner.stop()
             self.runner = None
 
-        # Restart preview timer
-        self.preview.timer.start()
+        # Keep the last frame on screen but hand its buffer back
+        self.preview.clear_frame()
 
+        self.cpu_meter.sample("running")
         self.is_running = False
         self.status.setText("STATE: IDLE")
+        # resumes the animation and the preview timer
+        self._apply_perf_mode()
         self._refresh()
 
 
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import math
+from typing import List, Optional
+
+from PySide6.QtCore import QPointF, QRect
+from PySide6.QtGui import QColor, QPainter, QPen, QPixmap
+from PySide6.QtWidgets import QWidget
+
+from client.core.history import ResultHistory
+
+
+class HistoryPlot(QWidget):
+    """
+    Scrolling distance/hold plot over a ResultHistory.
+    - refresh() pulls only rows added since the last call and draws just
+      that segment into a backing pixmap
+    - when the trace reaches the right edge the pixmap is scrolled, not redrawn
+    - paintEvent copies the dirty rect of the pixmap, nothing else
+    """
+
+    BACKGROUND = QColor(30, 30, 30)
+    AXIS = QColor(70, 70, 70)
+    DISTANCE = QColor(255, 255, 0)
+    HOLD = QColor(80, 160, 255)
+
+    def __init__(self, pixels_per_second: float = 60.0, range_px: float = 60.0, parent=None):
+        super().__init__(parent)
+        self.pixels_per_second = pixels_per_second
+        self.range_px = range_px  # distance shown at the top/bottom edge
+        self.hold_height = 12     # strip at the bottom showing the hold level
+
+        self.history: Optional[ResultHistory] = None
+        self._canvas: Optional[QPixmap] = None
+        self._seq = 0
+        self._t0: Optional[float] = None   # time at x = 0
+        self._last: Optional[QPointF] = None
+
+        self.setMinimumHeight(80)
+
+    def set_history(self, history: Optional[ResultHistory]) -> None:
+        self.history = history
+        self._seq = history.count if history is not None else 0
+        self._reset_canvas()
+
+    def _reset_canvas(self) -> None:
+        self._t0 = None
+        self._last = None
+        if self.width() <= 0 or self.height() <= 0:
+            self._canvas = None
+            return
+        self._canvas = QPixmap(self.size())
+        self._clear(QRect(0, 0, self.width(), self.height()))
+        self.update()
+
+    def _clear(self, rect: QRect) -> None:
+        painter = QPainter(self._canvas)
+        painter.fillRect(rect, self.BACKGROUND)
+        painter.setPen(QPen(self.AXIS, 1))
+        mid = self._plot_height() // 2
+        painter.drawLine(rect.left(), mid, rect.right(), mid)
+        painter.end()
+
+    def _plot_height(self) -> int:
+        return max(1, self.height() - self.hold_height)
+
+    def _y(self, distance: float) -> float:
+        half = self._plot_height() / 2.0
+        d = max(-self.range_px, min(self.range_px, distance))
+        return half - d / self.range_px * (half - 1)
+
+    def _scroll(self, shift: int) -> None:
+        w = self.width()
+        self._canvas.scroll(-shift, 0, self._canvas.rect())
+        self._clear(QRect(w - shift, 0, shift, self.height()))
+        self._t0 += shift / self.pixels_per_second
+        if self._last is not None:
+            self._last = QPointF(self._last.x() - shift, self._last.y())
+        self.update()
+
+    def refresh(self) -> None:
+        if self.history is None or self._canvas is None:
+            return
+        self._seq, cols = self.history.read_since(self._seq)
+        ts = cols["t"]
+        if not len(ts):
+            return
+
+        if self._t0 is None:
+            self._t0 = float(ts[0])
+        w = self.width()
+        x_end = (float(ts[-1]) - self._t0) * self.pixels_per_second
+        if x_end >= w:
+            # keep a quarter of the width free so we don't scroll every refresh
+            self._scroll(int(x_end - w) + w // 4)
+
+        pps, t0 = self.pixels_per_second, self._t0
+        plot_h = self._plot_height()
+        painter = QPainter(self._canvas)
+        painter.setPen(QPen(self.DISTANCE, 1))
+
+        x_min = w
+        segment: List[QPointF] = [self._last] if self._last is not None else []
+        for t, d, active, hold in zip(ts, cols["distance"], cols["active"], cols["hold"]):
+            x = (float(t) - t0) * pps
+            x_min = min(x_min, x)
+            if hold > 0.0:
+                h = max(1, int(hold * self.hold_height))
+                painter.fillRect(QRect(int(x), self.height() - h, 1, h), self.HOLD)
+            if not active or math.isnan(d):
+                # gap in the trace
+                if len(segment) > 1:
+                    painter.drawPolyline(segment)
+                segment = []
+                continue
+            segment.append(QPointF(x, self._y(float(d))))
+        if len(segment) > 1:
+            painter.drawPolyline(segment)
+        painter.end()
+
+        self._last = segment[-1] if segment else None
+        if self._last is not None:
+            x_min = min(x_min, self._last.x())
+        left = max(0, int(x_min) - 1)
+        self.update(QRect(left, 0, w - left, plot_h + self.hold_height))
+
+    def resizeEvent(self, event):
+        # older history would have to be re-plotted at the new size; start a fresh trace instead
+        self._reset_canvas()
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        if self._canvas is None:
+            painter.fillRect(self.rect(), self.BACKGROUND)
+            return
+        painter.drawPixmap(event.rect(), self._canvas, event.rect())
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional, Tuple
+
+from PySide6.QtCore import QTimer
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QPlainTextEdit
+
+from client.core.log_ring import LEVELS, LOG, LogRecord, LogRing
+
+
+class LogWidget(QPlainTextEdit):
+    """
+    Read-only view over a LogRing.
+    - Drains the ring in batches on a timer (never touched by worker threads)
+    - Identical messages (stage, level, text) are rate limited: the first one
+      shows immediately, repeats within `coalesce_s` are folded into one
+      "(xN)" line when the window closes
+    """
+
+    def __init__(
+        self,
+        ring: LogRing = LOG,
+        min_level: str = "info",
+        interval_ms: int = 250,
+        coalesce_s: float = 1.0,
+        batch: int = 500,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(500)
+        self.setFont(QFont("Consolas", 9))
+
+        self.ring = ring
+        self.min_level = LEVELS.get(min_level, LEVELS["info"])
+        self.coalesce_s = coalesce_s
+        self.batch = batch
+
+        # key -> (window start, suppressed count, last record)
+        self._windows: Dict[Tuple[str, str, str], Tuple[float, int, LogRecord]] = {}
+        self._last_dropped = 0
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start(interval_ms)
+
+    @staticmethod
+    def _format(rec: LogRecord, repeats: int = 0) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(rec.ts))
+        line = f"{stamp} [{rec.level.upper()}] {rec.stage}: {rec.message}"
+        if rec.counters:
+            line += "  " + " ".join(f"{k}={v}" for k, v in rec.counters.items())
+        if repeats:
+            line += f"  (x{repeats})"
+        return line
+
+    def flush(self) -> None:
+        now = time.monotonic()
+        lines: List[str] = []
+
+        for rec in self.ring.drain(self.batch):
+            if LEVELS.get(rec.level, 0) < self.min_level:
+                continue
+            key = (rec.stage, rec.level, rec.message)
+            window = self._windows.get(key)
+            if window is not None and now - window[0] < self.coalesce_s:
+                self._windows[key] = (window[0], window[1] + 1, rec)
+                continue
+            if window is not None and window[1]:
+                lines.append(self._format(window[2], window[1]))
+            self._windows[key] = (now, 0, rec)
+            lines.append(self._format(rec))
+
+        # close expired windows, emitting a summary for anything suppressed
+        for key, (start, count, rec) in list(self._windows.items()):
+            if now - start >= self.coalesce_s:
+                if count:
+                    lines.append(self._format(rec, count))
+                del self._windows[key]
+
+        dropped = self.ring.dropped
+        if dropped != self._last_dropped:
+            lines.append(f"... {dropped - self._last_dropped} log records overwritten")
+            self._last_dropped = dropped
+
+        if lines:
+            self.appendPlainText("\n".join(lines))
+
+    def set_min_level(self, level: Optional[str]) -> None:
+        self.min_level = LEVELS.get(level or "info", LEVELS["info"])
@@ -6,6 +6,7 @@ from PySide6.QtCore import Qt, QTimer
 from PySide6.QtGui import QPainter, QColor, QPen, QImage, QFont
 from PySide6.QtWidgets import QWidget
 
+from client.core.frame_pool import FrameBuffer
 from client.core.vision_simple import DetectionResult
 
 
@@ -13,13 +14,15 @@ class PreviewWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.raw: Optional[bytes] = None
+        self.raw: Optional[bytearray] = None
+        self._frame: Optional[FrameBuffer] = None
         self.w: int = 0
         self.h: int = 0
         self._qimage: Optional[QImage] = None
         self.result: Optional[DetectionResult] = None
 
         self.show_overlay = True
+        self.message: Optional[str] = None  # drawn over the frame, e.g. when the preview is paused
 
         self.timer = QTimer(self)
         self.timer.timeout.connect(self.update)
@@ -27,23 +30,48 @@ class PreviewWidget(QWidget):
 
         self.setMinimumSize(200, 200)
 
-    def update_frame(self, raw: bytes, w: int, h: int, result: DetectionResult):
-        self.raw = raw
+    def update_frame(self, frame: FrameBuffer, w: int, h: int, result: DetectionResult):
+        # Wrap the pooled buffer instead of copying it; the buffer stays ours
+        # until the next frame arrives, then goes back to the runner's pool.
+        previous = self._frame
+        self._frame = frame
+        self.raw = frame.raw
         self.w = w
         self.h = h
         self.result = result
 
-        bytes_per_line = W * 4
-        img = QImage(raw, w, h, bytes_per_line, QImage.Format.Format_RGBA8888)
-        self._qimage = img.copy()
+        bytes_per_line = w * 4
+        self._qimage = QImage(frame.raw, w, h, bytes_per_line, QImage.Format.Format_RGBA8888)
+        if previous is not None and previous is not frame:
+            previous.release()
         self.update()
 
+    def clear_frame(self):
+        # Drop the displayed buffer (e.g. when the runner stops)
+        if self._frame is not None:
+            self._qimage = self._qimage.copy() if self._qimage is not None else None
+            self._frame.release()
+            self._frame = None
+
+    def set_message(self, message: Optional[str]):
+        if message != self.message:
+            self.message = message
+            self.update()
+
+    def _draw_message(self, painter: QPainter):
+        if not self.message:
+            return
+        painter.setPen(QPen(QColor(255, 255, 0)))
+        painter.setFont(QFont("Arial", 10))
+        painter.drawText(self.rect().adjusted(0, 0, 0, -10), Qt.AlignHCenter | Qt.AlignBottom, self.message)
+
     def paintEvent(self, event):
         painter = QPainter(self)
         painter.setRenderHint(QPainter.SmoothPixmapTransform)
 
         if self._qimage is None:
             painter.fillRect(self.rect(), QColor(30, 30, 30))
+            self._draw_message(painter)
             return
 
         scaled = self._qimage.scaled(
@@ -56,6 +84,7 @@ class PreviewWidget(QWidget):
         offset_x =(self.width() - scaled.width()) // 2
         offset_y =(self.height()- scaled.height()) // 2
         painter.drawImage(offset_x, offset_y, scaled)
+        self._draw_message(painter)
 
         if not self.show_overlay or not self.result:
             return
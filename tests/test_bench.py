@@ -0,0 +1,37 @@
+import json
+import sys
+
+import pytest
+
+pytest.importorskip("pyautogui")
+
+from client.debug import bench
+from client.debug.bench import compare
+
+
+def test_compare_flags_slowdown_only_past_threshold():
+    baseline = {"detect": 100.0, "grab": 50.0}
+    assert compare({"detect": 109.0, "grab": 40.0}, baseline, 10.0) == []
+    assert len(compare({"detect": 120.0, "grab": 50.0}, baseline, 10.0)) == 1
+
+
+def test_compare_fails_on_missing_metric():
+    failures = compare({"detect": 100.0}, {"detect": 100.0, "grab": 50.0}, 10.0)
+    assert failures == ["grab: in baseline but missing from this run"]
+
+
+def test_saved_baseline_round_trip(tmp_path, monkeypatch):
+    # baselines are per machine, so the test stores its own instead of shipping one
+    path = tmp_path / "baseline.json"
+
+    def run(*args):
+        monkeypatch.setattr(sys, "argv", ["bench", "--iters", "5", *args])
+        return bench.main()
+
+    assert run("--save", str(path)) == 0
+    assert run("--compare", str(path), "--max-regress", "1000") == 0
+
+    doc = json.loads(path.read_text())
+    doc["metrics"]["renamed_metric_us"] = doc["metrics"].pop(next(iter(doc["metrics"])))
+    path.write_text(json.dumps(doc))
+    assert run("--compare", str(path), "--max-regress", "1000") == 1
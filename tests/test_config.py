@@ -0,0 +1,42 @@
+import json
+from copy import deepcopy
+
+from client.config.config_io import DEFAULT_CONFIG, load_config, migrate_config
+from client.core import vision_simple
+from client.core.log_ring import LOG
+from client.core.vision_simple import DetectParams, params_from_config
+
+LEGACY_VISION = {"white_threshold": 210, "black_threshold": 50, "min_blob_size": 200}
+
+
+def test_pre_tuning_vision_values_are_preserved(tmp_path, monkeypatch):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"vision": LEGACY_VISION}))
+    cfg = load_config(str(path))
+
+    vision = cfg["vision"]
+    assert {k: vision[k] for k in LEGACY_VISION} == LEGACY_VISION
+    assert vision["thresholds_version"] == 0
+    # the migration is written back, so the switch is visible in the file
+    assert json.loads(path.read_text())["vision"]["thresholds_version"] == 0
+
+    # the detector never read those, so it keeps its hand-tuned thresholds, and says so once
+    monkeypatch.setattr(vision_simple, "_legacy_warned", False)
+    LOG.drain()
+    params = params_from_config(vision)
+    params_from_config(vision)
+    assert (params.white_threshold, params.black_threshold) == (DetectParams().white_threshold,
+                                                                DetectParams().black_threshold)
+    assert len([r for r in LOG.drain() if r.level == "warn" and r.stage == "vision"]) == 1
+
+
+def test_migration_leaves_current_configs_alone():
+    assert migrate_config({"vision": {"white_threshold": 600}})["vision"]["thresholds_version"] == 1
+    assert migrate_config({"vision": dict(LEGACY_VISION, thresholds_version=1)})["vision"]["thresholds_version"] == 1
+
+
+def test_tuned_vision_values_are_used():
+    cfg = deepcopy(DEFAULT_CONFIG)
+    cfg["vision"].update(white_threshold=600, black_threshold=60)
+    params = params_from_config(cfg["vision"])
+    assert (params.white_threshold, params.black_threshold) == (600, 60)
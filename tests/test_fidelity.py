@@ -0,0 +1,95 @@
+from copy import deepcopy
+
+from client.config.config_io import DEFAULT_CONFIG
+from client.core.fidelity import FidelityController, fidelity_from_config
+from client.core.vision_simple import DetectParams
+
+BUDGET = 0.002
+
+
+def _controller(**kw):
+    return FidelityController(95, 380, DetectParams(), BUDGET, **kw)
+
+
+def _feed(fc, busy, n):
+    for _ in range(n):
+        fc.observe(busy)
+
+
+def test_steps_down_after_consecutive_ticks_over_budget():
+    fc = _controller(down_after=3)
+    _feed(fc, 0.003, 2)
+    fc.observe(0.001)  # one tick under budget restarts the count
+    _feed(fc, 0.003, 2)
+    assert fc.level == 0
+    fc.observe(0.003)
+    assert fc.level == 1 and fc.steps == 1
+
+
+def test_probe_measures_the_saving_of_a_step_down():
+    fc = _controller(down_after=3)
+    _feed(fc, 0.004, 3)
+    assert fc.level == 1
+    # same load, half the detection cost at the new level
+    _feed(fc, 0.002, fc.probe_ticks)
+    assert abs(fc.ratio[1] - 2.0) < 0.2
+    assert fc.level == 1
+
+
+def test_next_step_down_waits_for_the_probe():
+    fc = _controller(down_after=3)
+    _feed(fc, 0.008, 3)
+    # halved but still over budget: measured first, then the next step
+    _feed(fc, 0.004, fc.probe_ticks - 1)
+    assert fc.level == 1
+    fc.observe(0.004)
+    assert abs(fc.ratio[1] - 2.0) < 0.2
+    _feed(fc, 0.004, 3)
+    assert fc.level == 2
+
+
+def test_steps_up_when_the_better_level_fits_the_headroom():
+    fc = _controller(down_after=3, up_after=10)
+    _feed(fc, 0.004, 3)
+    _feed(fc, 0.0006, fc.probe_ticks)
+    assert fc.level == 1
+    # 0.0006 * ratio must fit 0.7 * budget; the load has dropped, so step up
+    ratio = fc.ratio[1]
+    busy = BUDGET * fc.headroom / ratio * 0.9
+    _feed(fc, busy, 9)
+    assert fc.level == 1
+    fc.observe(busy)
+    assert fc.level == 0
+
+
+def test_no_step_up_without_headroom():
+    fc = _controller(down_after=3, up_after=10)
+    _feed(fc, 0.004, 3)
+    _feed(fc, 0.0018, fc.probe_ticks)  # ratio ~2.2: 0.0018 * 2.2 > 0.7 * budget
+    _feed(fc, 0.0018, 100)
+    assert fc.level == 1
+
+
+def test_step_that_saves_nothing_is_undone_and_not_retried():
+    fc = _controller(down_after=3, retry_after=50)
+    _feed(fc, 0.004, 3)
+    assert fc.level == 1
+    # still over budget at the same cost: the level does not help
+    _feed(fc, 0.004, fc.probe_ticks)
+    assert fc.ratio[1] < fc.min_ratio
+    assert fc.level == 0 and fc.steps == 2
+    _feed(fc, 0.004, 40)
+    assert fc.level == 0
+    # once the hold-off runs out the controller may try again
+    _feed(fc, 0.004, 15)
+    assert fc.level == 1
+
+
+def test_off_when_the_pyramid_is_in_use():
+    cfg = deepcopy(DEFAULT_CONFIG)
+    cfg["vision"]["adaptive_fidelity"] = True
+    params = DetectParams()
+    assert fidelity_from_config(cfg, 95, 380, params) is not None
+    assert fidelity_from_config(cfg, 190, 1200, params) is None
+    cfg["vision"]["pyramid_factor"] = 1
+    assert fidelity_from_config(cfg, 190, 1200, params) is not None
@@ -0,0 +1,70 @@
+import tracemalloc
+
+import pytest
+
+pytest.importorskip("pyautogui")
+
+from client.config.config_io import DEFAULT_CONFIG
+from client.core.capture import SyntheticBackend
+from client.core.controller import Controller
+from client.core.loop import ControlLoop
+
+REGION = {"x": 0, "y": 0, "w": 95, "h": 380}
+
+
+def _noop():
+    pass
+
+
+def _loop():
+    ctrl = Controller(press=_noop, release=_noop)
+    loop = ControlLoop(REGION, DEFAULT_CONFIG, controller=ctrl, backend=SyntheticBackend(REGION))
+    loop.open()
+    return loop
+
+
+def _traced(fn, frames):
+    for _ in range(200):  # warm up caches / lazy imports / kernel JIT
+        fn()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for _ in range(frames):
+        fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current - base, peak - base
+
+
+def test_tick_publish_path_does_not_allocate_per_frame():
+    loop = _loop()
+    frame_bytes = REGION["w"] * REGION["h"] * 4
+
+    def publish():
+        # what Runner does with a published frame: consumer gets it, then hands it back
+        buf, _ = loop.tick()
+        buf.release()
+
+    try:
+        retained, peak = _traced(publish, 2000)
+    finally:
+        loop.close()
+    assert retained < 1024
+    assert peak < frame_bytes // 10
+
+
+def test_exhausted_pool_does_not_allocate_per_frame():
+    loop = _loop()
+    held = [loop.pool.acquire() for _ in range(loop.pool.size)]
+
+    def dropped():
+        buf, _ = loop.tick()
+        assert buf is None
+
+    try:
+        retained, _ = _traced(dropped, 2000)
+    finally:
+        for buf in held:
+            buf.release()
+        loop.close()
+    assert retained < 1024
+    assert loop.pool.exhausted == 2200
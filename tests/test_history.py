@@ -0,0 +1,67 @@
+import math
+import tracemalloc
+
+import numpy as np
+
+from client.core.history import ResultHistory
+from client.core.vision_simple import DetectionResult
+
+
+def _result(i):
+    return DetectionResult(100 + i % 50, 90, float(10 + i % 50), True)
+
+
+def test_read_since_returns_new_rows_only():
+    hist = ResultHistory(capacity=1000)
+    for i in range(10):
+        hist.append(_result(i), 0.5, t=float(i))
+    seq, cols = hist.read_since(0)
+    assert seq == 10
+    assert list(cols["t"]) == [float(i) for i in range(10)]
+
+    hist.append(DetectionResult(None, None, None, False), 0.0, t=10.0)
+    seq, cols = hist.read_since(seq)
+    assert seq == 11
+    assert list(cols["t"]) == [10.0]
+    assert not cols["active"][0] and cols["white_y"][0] == -1 and math.isnan(cols["distance"][0])
+    assert hist.read_since(seq)[1]["t"].size == 0
+
+
+def test_ring_wraps_around():
+    hist = ResultHistory(capacity=100)
+    for i in range(250):
+        hist.append(_result(i), t=float(i))
+    assert len(hist) == 100
+    assert hist.count == 250
+    # the last rows straddle the wrap point (250 % 100 == 50)
+    seq, cols = hist.read_since(230)
+    assert seq == 250
+    assert list(cols["t"]) == [float(i) for i in range(230, 250)]
+
+
+def test_lapped_reader_is_clamped_behind_the_writer():
+    hist = ResultHistory(capacity=200)
+    for i in range(1000):
+        hist.append(_result(i), t=float(i))
+    # the reader last saw row 10, long overwritten: it gets the oldest rows
+    # still safe to read, READ_MARGIN away from the write position
+    seq, cols = hist.read_since(10)
+    start = 1000 - 200 + ResultHistory.READ_MARGIN
+    assert seq == 1000
+    assert list(cols["t"]) == [float(i) for i in range(start, 1000)]
+    assert np.all(np.diff(cols["t"]) == 1.0)
+
+
+def test_append_does_not_allocate():
+    hist = ResultHistory(capacity=5000)
+    results = [_result(i) for i in range(41)] + [DetectionResult(None, None, None, False)]
+    for i in range(1000):
+        hist.append(results[i % len(results)], 0.5, t=float(i))
+
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for i in range(20000):
+        hist.append(results[i % len(results)], 0.5, t=1.5)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert current - base < 1024
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from client.core import vision_simple as vs
+from client.core.kernels import KERNELS, verify_kernel
+
+
+@pytest.fixture(params=["numpy", "numba", "opencv"])
+def kernel(request):
+    cls = KERNELS[request.param]
+    if not cls.available():
+        pytest.skip(f"{request.param} not installed")
+    return cls()
+
+
+def _edge_frame(w, h, params):
+    # brightness exactly on and one either side of both thresholds, plus the extremes
+    values = np.array([params.white_threshold - 1, params.white_threshold, params.white_threshold + 1,
+                       params.black_threshold - 1, params.black_threshold, params.black_threshold + 1, 0, 765])
+    total = values[(np.arange(h)[:, None] * 3 + np.arange(w)[None, :]) % len(values)]
+    frame = np.empty((h, w, 4), dtype=np.uint8)
+    frame[..., 0] = np.minimum(total, 255)
+    frame[..., 1] = np.clip(total - 255, 0, 255)
+    frame[..., 2] = np.clip(total - 510, 0, 255)
+    frame[..., 3] = 255
+    return frame
+
+
+@pytest.mark.parametrize("w,h", [(95, 380), (33, 17), (7, 1), (1, 5)])
+def test_verify_kernel(kernel, w, h):
+    assert verify_kernel(kernel, w, h)
+
+
+@pytest.mark.parametrize("w,h", [(95, 380), (31, 9), (5, 1)])
+@pytest.mark.parametrize("white,black", [(650, 100), (600, 60), (1, 0), (765, 764)])
+def test_kernel_matches_numpy_on_threshold_edges(kernel, w, h, white, black):
+    params = vs.DetectParams(white_threshold=white, black_threshold=black, crop_left=0.0, crop_right=1.0)
+    frame = _edge_frame(w, h, params)
+    for rows in (slice(None), slice(0, 1), slice(h - 1, h)):
+        ref = vs.DetectWork(w, h, params)
+        got = vs.DetectWork(w, h, params)
+        got.white_counts[:] = 7
+        got.black_counts[:] = 7
+        cropped = frame[rows]
+        vs.row_counts_numpy(cropped, ref, rows)
+        kernel(cropped, got, rows)
+        assert np.array_equal(ref.white_counts[rows], got.white_counts[rows])
+        assert np.array_equal(ref.black_counts[rows], got.black_counts[rows])
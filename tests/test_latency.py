@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("pyautogui")
+
+from client.core.controller import Controller
+from client.core.latency import measure_latency
+from client.core.sim import SimulatedScreen
+
+
+@pytest.mark.parametrize("delay", [0.020, 0.050])
+def test_measure_latency_recovers_sim_delay(delay):
+    screen = SimulatedScreen(delay=delay)
+    ctrl = Controller(press=screen.press, release=screen.release)
+
+    stats = measure_latency(ctrl, screen.grab, pulses=8, settle=0.1)
+
+    assert stats.failures == 0
+    p50 = stats.percentile(50)
+    # the bar has to move min_move px after the delay and one capture has to see it
+    assert delay * 1000.0 <= p50 <= delay * 1000.0 + 15.0
@@ -0,0 +1,37 @@
+import threading
+
+from client.core.log_ring import LogRing
+
+
+def test_drain_returns_records_in_order():
+    ring = LogRing(capacity=8)
+    for i in range(5):
+        ring.info("test", f"m{i}", i=i)
+    first = ring.drain(max_items=2)
+    assert [r.message for r in first] == ["m0", "m1"]
+    assert [r.counters["i"] for r in ring.drain()] == [2, 3, 4]
+    assert ring.drain() == []
+
+
+def test_overflow_keeps_newest_and_counts_dropped():
+    ring = LogRing(capacity=4)
+    for i in range(10):
+        ring.warn("test", f"m{i}")
+    assert ring.dropped == 6
+    assert [r.message for r in ring.drain()] == ["m6", "m7", "m8", "m9"]
+
+
+def test_dropped_is_exact_with_concurrent_writers():
+    ring = LogRing(capacity=64)
+    per_thread, threads = 5000, 4
+
+    def write():
+        for i in range(per_thread):
+            ring.debug("test", "m")
+
+    workers = [threading.Thread(target=write) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    assert ring.dropped + len(ring.drain()) == per_thread * threads
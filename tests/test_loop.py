@@ -0,0 +1,155 @@
+import threading
+import time
+from copy import deepcopy
+
+import pytest
+
+pytest.importorskip("pyautogui")
+
+from client.config.config_io import DEFAULT_CONFIG
+from client.core.capture import CaptureTrigger, SyntheticBackend
+from client.core.controller import Controller
+from client.core.loop import ControlLoop
+
+REGION = {"x": 0, "y": 0, "w": 95, "h": 380}
+
+
+class FailingBackend(SyntheticBackend):
+    """
+    Synthetic frames (bar far above the line: hold) until `good` grabs, then errors.
+    """
+
+    def __init__(self, region, cfg=None, good=10):
+        super().__init__(region, cfg)
+        self.good = good
+        self.grabs = 0
+
+    def grab_into(self, buf):
+        self.grabs += 1
+        if self.grabs > self.good:
+            raise RuntimeError("Capture failed: test")
+        return super().grab_into(buf)
+
+
+def _loop(backend, capture=None, **control):
+    cfg = deepcopy(DEFAULT_CONFIG)
+    cfg["capture"].update(capture or {})
+    cfg["control"].update(control)
+    events = []
+    ctrl = Controller(press=lambda: events.append("press"), release=lambda: events.append("release"))
+    ctrl.max_age = cfg["control"]["max_frame_age_ms"] / 1000.0
+    return ControlLoop(REGION, cfg, controller=ctrl, backend=backend), events
+
+
+def test_capture_errors_release_after_max_frame_age():
+    loop, events = _loop(FailingBackend(REGION), watchdog_ms=0, max_frame_age_ms=100)
+    end = time.perf_counter() + 0.5
+    loop.run(lambda: time.perf_counter() < end)
+
+    assert events[0] == "press"
+    assert events[-1] == "release"
+    assert loop.controller.stale > 0
+    assert not loop.controller.holding
+
+
+def test_watchdog_release_waits_for_running_update():
+    loop, events = _loop(SyntheticBackend(REGION))
+    released = threading.Event()
+
+    # stand-in for a tick that is inside controller.update()
+    with loop._control_lock:
+        t = threading.Thread(target=lambda: (loop.watchdog.on_stall(), released.set()))
+        t.start()
+        assert not released.wait(0.1)
+        assert "release" not in events
+    t.join(1.0)
+    assert released.is_set()
+    assert events == ["release"]
+
+
+class ScriptedTrigger(CaptureTrigger):
+    """
+    Reports damage for the first `damaged` waits, then stays idle.
+    """
+
+    name = "scripted"
+
+    def __init__(self, region, damaged):
+        super().__init__(region)
+        self.damaged = damaged
+
+    def wait(self, timeout):
+        if self.damaged > 0:
+            self.damaged -= 1
+            return True
+        time.sleep(timeout)
+        return False
+
+
+class MovingBackend(SyntheticBackend):
+    """
+    White line moves on every grab, so each frame detects differently.
+    """
+
+    def grab_into(self, buf):
+        self.sim.white_y = 170 if self.sim.white_y == 150 else 150
+        return super().grab_into(buf)
+
+
+def test_idle_trigger_wakeups_do_not_capture():
+    backend = FailingBackend(REGION, good=1000)
+    loop, _ = _loop(backend, capture={"idle_capture_ms": 10000})
+    loop.trigger = ScriptedTrigger(REGION, damaged=5)
+    end = time.perf_counter() + 0.6
+    loop.run(lambda: time.perf_counter() < end)
+
+    assert backend.grabs == 5
+    assert loop.idle_wakeups > 0
+    assert loop.idle_captures == 0
+    # idle, not stalled: the watchdog allows for the wait
+    assert loop.watchdog.stalls == 0
+
+
+def test_idle_trigger_forces_periodic_captures():
+    backend = FailingBackend(REGION, good=1000)
+    loop, _ = _loop(backend, capture={"idle_capture_ms": 100})
+    loop.trigger = ScriptedTrigger(REGION, damaged=5)
+    end = time.perf_counter() + 0.6
+    loop.run(lambda: time.perf_counter() < end)
+
+    assert loop.idle_captures >= 3
+    assert backend.grabs == 5 + loop.idle_captures
+    assert loop.missed_damage == 0
+    assert loop.watchdog.stalls == 0
+
+
+def test_idle_capture_reports_missed_damage():
+    loop, _ = _loop(MovingBackend(REGION), capture={"idle_capture_ms": 50})
+    loop.trigger = ScriptedTrigger(REGION, damaged=1)
+    end = time.perf_counter() + 0.4
+    loop.run(lambda: time.perf_counter() < end)
+
+    assert loop.idle_captures > 0
+    assert loop.missed_damage == loop.idle_captures
+
+
+def test_idle_wakeups_count_a_stale_result_once():
+    loop, events = _loop(SyntheticBackend(REGION), capture={"idle_capture_ms": 10000},
+                         watchdog_ms=0, max_frame_age_ms=100)
+    loop.trigger = ScriptedTrigger(REGION, damaged=3)
+    end = time.perf_counter() + 0.6
+    loop.run(lambda: time.perf_counter() < end)
+
+    assert loop.idle_wakeups > 3
+    assert loop.controller.stale == 1
+    assert not loop.controller.holding
+
+
+def test_damage_ticks_record_jitter():
+    loop, _ = _loop(SyntheticBackend(REGION))
+    # damage always pending: wait() never blocks, so every tick is a scheduled one
+    loop.trigger = ScriptedTrigger(REGION, damaged=10 ** 9)
+    end = time.perf_counter() + 0.3
+    loop.run(lambda: time.perf_counter() < end)
+
+    assert loop.jitter.summary()["ticks"] > 10
@@ -0,0 +1,15 @@
+from client.core.realtime import JitterStats
+
+
+def test_jitter_keeps_sampling_past_capacity():
+    stats = JitterStats(keep=100)
+    t = 0.0
+    for i in range(1000):
+        # the last 100 ticks start 5 ms late, everything before is on time
+        late = 0.005 if i >= 900 else 0.0
+        stats.tick(t + late, 0.01)
+        t += 0.01
+    summary = stats.summary()
+    assert summary["ticks"] == 999
+    assert len(stats.samples) == 100
+    assert summary["max_ms"] == 5.0
@@ -0,0 +1,24 @@
+import pytest
+
+from client.core.scheduler import TickScheduler
+from client.core.vision_simple import DetectionResult
+
+INACTIVE = DetectionResult(None, None, None, False)
+
+
+def test_idle_polls_at_idle_hz():
+    sched = TickScheduler(min_hz=30, max_hz=240, idle_hz=120)
+    assert sched.next_interval(INACTIVE, 0.0) == pytest.approx(1 / 120)
+    assert sched.next_interval(None, 0.01) == pytest.approx(1 / 120)
+
+
+def test_first_active_frame_runs_at_max_hz():
+    sched = TickScheduler(min_hz=30, max_hz=240, idle_hz=60)
+    t = 0.0
+    for _ in range(5):
+        t += sched.next_interval(INACTIVE, t)
+    # a stable bar far from the thresholds would otherwise relax straight to min_hz
+    active = DetectionResult(150, 110, 40.0, True)
+    assert sched.next_interval(active, t) == pytest.approx(1 / 240)
+    # and from there it relaxes at most 25% per tick
+    assert sched.next_interval(active, t + 1 / 240) <= 1.25 / 240 + 1e-9
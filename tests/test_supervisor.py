@@ -0,0 +1,36 @@
+import queue
+from copy import deepcopy
+from types import SimpleNamespace
+
+import pytest
+
+from client.config.config_io import DEFAULT_CONFIG
+from client.core.supervisor import Supervisor
+
+REGION = {"x": 0, "y": 0, "w": 95, "h": 380}
+
+
+def _cfg(*dry_run):
+    cfg = deepcopy(DEFAULT_CONFIG)
+    cfg["supervisor"]["instances"] = [
+        {"name": f"w{i}", "region": REGION, "cores": [], "dry_run": d} for i, d in enumerate(dry_run)
+    ]
+    return cfg
+
+
+def test_refuses_more_than_one_real_instance():
+    with pytest.raises(ValueError, match="w0, w1"):
+        Supervisor(_cfg(False, False, True))
+    Supervisor(_cfg(False, True, True))
+
+
+def test_stats_from_a_replaced_process_are_dropped():
+    sup = Supervisor(_cfg(True))
+    sup.stats_q = queue.Queue()
+    w = sup.workers[0]
+    w.process = SimpleNamespace(pid=200)   # restarted worker
+
+    sup.stats_q.put(("w0", 200, {"ticks": 5}))
+    sup.stats_q.put(("w0", 100, {"ticks": 9000}))   # final report of the old process
+    sup._drain_stats()
+    assert w.stats == {"ticks": 5}
@@ -0,0 +1,6 @@
+from client.debug.tune_vision import PYRAMID_FACTORS, settings_grid
+
+
+def test_grid_skips_pyramid_below_min_height():
+    assert {s["pyramid_factor"] for s in settings_grid(["numpy"], 380, 800)} == {1}
+    assert {s["pyramid_factor"] for s in settings_grid(["numpy"], 900, 800)} == set(PYRAMID_FACTORS)
@@ -0,0 +1,46 @@
+import threading
+import time
+
+from client.core.watchdog import FrameWatchdog
+
+
+def test_fires_once_when_frames_stop_and_counts_the_late_frame():
+    stalled = threading.Event()
+    wd = FrameWatchdog(0.04, stalled.set)
+    wd.start()
+    try:
+        assert stalled.wait(0.5)
+        time.sleep(0.1)
+        assert wd.stalls == 1
+        wd.feed(time.perf_counter())
+    finally:
+        wd.stop()
+    assert not wd.stalled
+    assert wd.summary() == {"stalls": 1, "late": 1}
+
+
+def test_idle_wait_is_allowed_for_but_not_unbounded():
+    stalled = threading.Event()
+    wd = FrameWatchdog(0.04, stalled.set)
+    wd.idle_allowance = 0.3
+    wd.idle = True
+    wd.start()
+    try:
+        # well past the timeout, inside timeout + idle_allowance
+        assert not stalled.wait(0.2)
+        # a forced capture that never comes is still a stall
+        assert stalled.wait(0.5)
+    finally:
+        wd.stop()
+    assert wd.stalls == 1
+
+
+def test_idle_allowance_does_not_apply_while_capturing():
+    stalled = threading.Event()
+    wd = FrameWatchdog(0.04, stalled.set)
+    wd.idle_allowance = 10.0
+    wd.start()
+    try:
+        assert stalled.wait(0.5)
+    finally:
+        wd.stop()